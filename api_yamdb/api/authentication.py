@@ -0,0 +1,109 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+REVOKED_TOKEN_KEY = 'jwt-revoked-token:{}'
+REVOKED_USER_KEY = 'jwt-revoked-user:{}'
+
+
+class RoleAccessToken(AccessToken):
+    """
+    Access-токен, в котором есть всё, что нужно проверкам прав. Время
+    выпуска хранится с долями секунды, чтобы отзыв по времени не задевал
+    токены, выпущенные в ту же секунду после смены роли.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['iat'] = token.current_time.timestamp()
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def revoke_token(token):
+    """Отзывает токен до истечения срока его действия."""
+    timeout = max(int(token['exp'] - time.time()), 1)
+    cache.set(REVOKED_TOKEN_KEY.format(token['jti']), True, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """Отзывает все токены с ролью пользователя, выданные до этого момента."""
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(REVOKED_USER_KEY.format(user_id), time.time(), timeout)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Не читает пользователя из БД, если роль и флаги есть в токене:
+    пользователь собирается из claims. Отметки об отзыве хранятся в общем
+    кэше (см. api.E001), поэтому действуют во всех процессах. Токены без
+    роли в claims проверяются по БД на каждый запрос.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        stateless = all(claim in validated_token for claim in ROLE_CLAIMS)
+        keys = [REVOKED_TOKEN_KEY.format(validated_token.get('jti'))]
+        if stateless:
+            keys.append(REVOKED_USER_KEY.format(user_id))
+        revoked = cache.get_many(keys)
+        revoked_at = revoked.get(REVOKED_USER_KEY.format(user_id))
+        if keys[0] in revoked or (
+                revoked_at is not None
+                and validated_token.get('iat', 0) < revoked_at):
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_revoked'
+            )
+        if stateless:
+            return self.build_user(validated_token)
+        return super().get_user(validated_token)
+
+    def build_user(self, validated_token):
+        user = User(
+            id=validated_token[api_settings.USER_ID_CLAIM],
+            is_active=True,
+            **{claim: validated_token[claim] for claim in ROLE_CLAIMS},
+        )
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
+
+
+@receiver(pre_save, sender=User)
+def check_role_change(sender, instance, **kwargs):
+    instance._role_changed = False
+    if instance.pk is None:
+        return
+    previous = (
+        User.objects.filter(pk=instance.pk)
+        .values(*ROLE_CLAIMS, 'is_active')
+        .first()
+    )
+    instance._role_changed = bool(previous) and any(
+        previous[field] != getattr(instance, field) for field in previous
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_on_role_change(sender, instance, **kwargs):
+    # после фиксации: токен, выданный до неё, мог получить ещё старую роль
+    if getattr(instance, '_role_changed', False):
+        transaction.on_commit(lambda: revoke_user_tokens(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def revoke_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user_tokens(user_id))
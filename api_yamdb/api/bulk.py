@@ -0,0 +1,294 @@
+import json
+
+from django.db import IntegrityError, connections, router, transaction
+from django.utils.encoding import smart_str
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from reviews.models import (Category, Genre, Review, Title, TitleGenre,
+                            add_review_scores)
+from reviews.search import index_objects
+from users.models import User
+from .cache import bump_versions, table_version
+from .serializers import ReviewIngestSerializer, TitlePostSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def slug_lookups(items):
+    """Все жанры и категории, упомянутые в items, по два запроса IN."""
+    genres, categories = set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get('genre'), list):
+            genres.update(
+                smart_str(slug) for slug in item['genre']
+                if isinstance(slug, (str, int))
+            )
+        if isinstance(item.get('category'), (str, int)):
+            categories.add(smart_str(item['category']))
+    return {
+        Genre: {genre.slug: genre for genre in Genre.objects.filter(
+            slug__in=genres)} if genres else {},
+        Category: {category.slug: category for category in
+                   Category.objects.filter(slug__in=categories)}
+        if categories else {},
+    }
+
+
+def validate_titles(items):
+    """
+    Проверяет элементы сериализатором TitlePostSerializer без запросов
+    на каждый элемент. Элемент с id - частичное изменение произведения.
+    Возвращает (создать, изменить, ошибки).
+    """
+    context = {'slug_lookups': slug_lookups(items)}
+    creator = TitlePostSerializer(context=context)
+    updater = TitlePostSerializer(context=context, partial=True)
+    instances = Title.objects.in_bulk([
+        item['id'] for item in items
+        if isinstance(item, dict) and isinstance(item.get('id'), int)
+    ])
+    to_create, to_update, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValidationError(
+                    {'non_field_errors': ['Ожидается объект.']}
+                )
+            if 'id' not in item:
+                to_create.append((index, creator.run_validation(item)))
+                continue
+            instance = instances.get(item['id'])
+            if instance is None:
+                raise ValidationError({'id': ['Произведение не найдено.']})
+            to_update.append(
+                (index, instance, updater.run_validation(item))
+            )
+        except ValidationError as error:
+            errors.append((index, error.detail))
+    return to_create, to_update, errors
+
+
+def insert_titles(titles, using, batch_size):
+    """
+    Вставляет новые произведения без сигналов и проставляет им id. Без
+    RETURNING id читаются обратно: в SQLite вставка держит блокировку
+    записи до конца транзакции, поэтому последние len(titles) id - наши и
+    идут по порядку. На прочих бекендах без RETURNING параллельная вставка
+    перемешала бы id, и строки вставляются по одной.
+    """
+    if not titles:
+        return
+    connection = connections[using]
+    if connection.features.can_return_rows_from_bulk_insert:
+        Title.objects.using(using).bulk_create(titles, batch_size=batch_size)
+        return
+    if connection.vendor == 'sqlite':
+        Title.objects.using(using).bulk_create(titles, batch_size=batch_size)
+        pks = Title.objects.using(using).order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(titles)]
+        for title, pk in zip(titles, reversed(list(pks))):
+            title.pk = pk
+        return
+    fields = [
+        field for field in Title._meta.concrete_fields
+        if field is not Title._meta.auto_field
+    ]
+    for title in titles:
+        # та же вставка, что в Model.save(), но без сигналов
+        [(title.pk,)] = Title.objects.using(using)._insert(
+            [title], fields=fields, using=using,
+            returning_fields=Title._meta.db_returning_fields,
+        )
+        title._state.adding = False
+        title._state.db = using
+
+
+def bulk_save_titles(items, batch_size=1000):
+    """
+    Создаёт и изменяет произведения через bulk_create/bulk_update вместе со
+    связями TitleGenre в одной транзакции. Сигналы при этом не
+    отправляются, поэтому поисковый индекс и версии кэша обновляются здесь.
+    Возвращает результат для каждого элемента в порядке items.
+    """
+    to_create, to_update, errors = validate_titles(items)
+    results = [None] * len(items)
+    for index, detail in errors:
+        results[index] = {'index': index, 'status': 'error', 'errors': detail}
+
+    using = router.db_for_write(Title)
+    links = {}
+    with transaction.atomic(using=using):
+        created = [
+            Title(**{key: value for key, value in data.items()
+                     if key != 'genre'})
+            for _, data in to_create
+        ]
+        insert_titles(created, using, batch_size)
+        for title, (index, data) in zip(created, to_create):
+            links[title.pk] = data.get('genre', [])
+            results[index] = {
+                'index': index, 'status': 'created', 'id': title.pk
+            }
+
+        fields = set()
+        for index, title, data in to_update:
+            for key, value in data.items():
+                if key == 'genre':
+                    links[title.pk] = value
+                else:
+                    setattr(title, key, value)
+                    fields.add(key)
+            results[index] = {
+                'index': index, 'status': 'updated', 'id': title.pk
+            }
+        updated = [title for _, title, _ in to_update]
+        if fields:
+            Title.objects.bulk_update(updated, fields, batch_size=batch_size)
+        TitleGenre.objects.filter(
+            title_id__in=[title.pk for title in updated
+                          if title.pk in links]
+        ).delete()
+        TitleGenre.objects.bulk_create(
+            (
+                TitleGenre(title_id=pk, genre_id=genre_id)
+                for pk, genres in links.items()
+                for genre_id in dict.fromkeys(genre.pk for genre in genres)
+            ),
+            batch_size=batch_size,
+        )
+        saved = [title.pk for title in (*created, *updated)]
+        index_objects(Title, saved, using)
+    if saved:
+        bump_versions(
+            'titles', table_version(Title), table_version(TitleGenre),
+            *(f'title:{pk}' for pk in saved)
+        )
+    return results
+
+
+class ReviewIngest:
+    """
+    Загрузка отзывов из NDJSON-потока порциями по batch_size строк: в
+    памяти держится одна порция и не больше max_errors описаний ошибок.
+    Каждая порция проверяется без запросов на строку и сохраняется в своей
+    транзакции; повторы по unique_author пропускаются.
+    """
+
+    def __init__(self, batch_size, max_errors=100):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.serializer = ReviewIngestSerializer()
+        self.loads = orjson.loads if orjson is not None else json.loads
+        self.lines = self.created = self.duplicates = self.invalid = 0
+        self.errors = []
+
+    def run(self, lines):
+        batch = []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            self.lines += 1
+            try:
+                batch.append(
+                    (number, self.serializer.run_validation(self.loads(line)))
+                )
+            except ValueError as exc:
+                self.error(number, {api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'JSON parse error - {exc}'
+                ]})
+            except ValidationError as exc:
+                self.error(number, exc.detail)
+            if len(batch) >= self.batch_size:
+                self.save(batch)
+                batch = []
+        if batch:
+            self.save(batch)
+        return {
+            'lines': self.lines,
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'errors': self.errors,
+        }
+
+    def error(self, number, detail):
+        self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': number, 'errors': detail})
+
+    def insert_new(self, reviews, using, attempts=3):
+        """
+        Вставляет отзывы, пар (title_id, author_id) которых ещё нет, и
+        возвращает вставленные. Если параллельный запрос успел добавить
+        такую же пару, вставка откатывается до точки сохранения и
+        повторяется без неё, поэтому возвращаются только реально
+        вставленные строки.
+        """
+        for attempt in range(attempts):
+            existing = set(Review.objects.filter(
+                title_id__in={title_id for title_id, _ in reviews},
+                author_id__in={author_id for _, author_id in reviews},
+            ).values_list('title_id', 'author_id'))
+            new = [
+                review for key, review in reviews.items()
+                if key not in existing
+            ]
+            if not new:
+                return new
+            try:
+                with transaction.atomic(using=using):
+                    Review.objects.bulk_create(new, self.batch_size)
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+                for review in new:
+                    review.pk = None
+                continue
+            return new
+
+    def save(self, batch):
+        titles = set(Title.objects.filter(
+            pk__in={row['title'] for _, row in batch}
+        ).values_list('pk', flat=True))
+        authors = dict(User.objects.filter(
+            username__in={row['author'] for _, row in batch}
+        ).values_list('username', 'pk'))
+        reviews = {}
+        for number, row in batch:
+            if row['title'] not in titles:
+                self.error(number, {'title': ['Произведение не найдено.']})
+            elif row['author'] not in authors:
+                self.error(number, {'author': ['Пользователь не найден.']})
+            else:
+                key = (row['title'], authors[row['author']])
+                if key in reviews:
+                    self.duplicates += 1
+                    continue
+                reviews[key] = Review(
+                    title_id=key[0], author_id=key[1],
+                    text=row['text'], score=row['score'],
+                )
+        if not reviews:
+            return
+        using = router.db_for_write(Review)
+        with transaction.atomic(using=using):
+            new = self.insert_new(reviews, using)
+            self.duplicates += len(reviews) - len(new)
+            if not new:
+                return
+            add_review_scores(new)
+        self.created += len(new)
+        title_ids = {review.title_id for review in new}
+        bump_versions(
+            table_version(Review), table_version(Title), 'titles',
+            *(f'title:{pk}' for pk in title_ids),
+            *(f'reviews:{pk}' for pk in title_ids),
+        )
@@ -0,0 +1,58 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_PREFIX = 'version:'
+EPOCH = 'epoch'
+
+
+def table_version(model):
+    return f'table:{model._meta.db_table}'
+
+
+def get_versions(*names, created=None):
+    """
+    Версии именованных наборов данных (время последнего изменения в нс).
+    Первой всегда идёт общая эпоха, которая сбрасывается после migrate
+    и flush. Отсутствующая в кэше версия создаётся заново со временем
+    created (по умолчанию - текущим), поэтому вытеснение ключа приводит
+    только к промаху, но не к устаревшим данным.
+    """
+    keys = [f'{VERSION_PREFIX}{name}' for name in (EPOCH, *names)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, created or time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*names):
+    """
+    Сдвигает версии после фиксации транзакции: иначе параллельный запрос
+    успел бы закэшировать ещё старые данные под новой версией. Каждый
+    путь записи в обход сигналов (update, bulk_create) вызывает её сам.
+    """
+    def bump():
+        now = time.time_ns()
+        cache.set_many(
+            {f'{VERSION_PREFIX}{name}': now for name in names}, None
+        )
+
+    transaction.on_commit(bump)
+
+
+def count_event(name):
+    """Счётчик для мониторинга, например попаданий и промахов кэша."""
+    key = f'counter:{name}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_counters(*names):
+    values = cache.get_many([f'counter:{name}' for name in names])
+    return {name: values.get(f'counter:{name}', 0) for name in names}
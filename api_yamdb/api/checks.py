@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Версии данных для ETag и кэша ответов (api.cache) должны быть общими
+    для всех процессов, иначе процесс, не видевший изменения, отдаст
+    устаревший ответ или ошибочный 304. Кэш в памяти процесса допустим
+    только при DEBUG, то есть в однопроцессном runserver.
+    """
+    if settings.DEBUG or not isinstance(
+            caches['default'], (LocMemCache, DummyCache)):
+        return []
+    return [Error(
+        'Кэш default хранится в памяти процесса.',
+        hint=(
+            'Задайте общий кэш через DJANGO_CACHE_BACKEND и '
+            'DJANGO_CACHE_LOCATION, например Redis или Memcached.'
+        ),
+        id='api.E001',
+    )]
@@ -0,0 +1,110 @@
+import csv
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Dataset(NamedTuple):
+    """Раскладка одного CSV-файла из static/data."""
+    file: str
+    model: type
+    columns: tuple
+    references: dict = {}
+
+    @property
+    def header(self):
+        return [column for column, _ in self.columns]
+
+    @property
+    def attnames(self):
+        return [attname for _, attname in self.columns]
+
+
+DATASETS = {
+    'users': Dataset(
+        'users.csv', User,
+        (('id', 'id'), ('username', 'username'), ('email', 'email'),
+         ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+         ('last_name', 'last_name')),
+    ),
+    'category': Dataset(
+        'category.csv', Category,
+        (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    ),
+    'genre': Dataset(
+        'genre.csv', Genre,
+        (('id', 'id'), ('name', 'name'), ('slug', 'slug')),
+    ),
+    'titles': Dataset(
+        'titles.csv', Title,
+        (('id', 'id'), ('name', 'name'), ('year', 'year'),
+         ('category', 'category_id')),
+        {'category_id': 'category'},
+    ),
+    'genre_title': Dataset(
+        'genre_title.csv', TitleGenre,
+        (('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id')),
+        {'title_id': 'titles', 'genre_id': 'genre'},
+    ),
+    'review': Dataset(
+        'review.csv', Review,
+        (('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+         ('author', 'author_id'), ('score', 'score'),
+         ('pub_date', 'pub_date')),
+        {'title_id': 'titles', 'author_id': 'users'},
+    ),
+    'comments': Dataset(
+        'comments.csv', Comment,
+        (('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+         ('author', 'author_id'), ('pub_date', 'pub_date')),
+        {'review_id': 'review', 'author_id': 'users'},
+    ),
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return DjangoJSONEncoder().default(value)
+    return value
+
+
+def export_lines(dataset, file_format='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки выгрузки в раскладке static/data. Таблица читается через
+    iterator(), поэтому расход памяти не зависит от её размера.
+    """
+    rows = (
+        dataset.model.objects.order_by('pk')
+        .values_list(*dataset.attnames)
+        .iterator(chunk_size=chunk_size)
+    )
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(dataset.header)
+        for row in rows:
+            yield writer.writerow([export_value(value) for value in row])
+        return
+    for row in rows:
+        yield json.dumps(
+            dict(zip(dataset.header, row)),
+            cls=DjangoJSONEncoder, ensure_ascii=False,
+        ) + '\n'
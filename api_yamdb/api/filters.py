@@ -1,14 +1,92 @@
+from functools import reduce
+from operator import or_
 
+from django.db.models import Exists, OuterRef, Q
+from django_filters.constants import EMPTY_VALUES
+from django_filters.rest_framework import (CharFilter, ChoiceFilter,
+                                           FilterSet, OrderingFilter)
+from rest_framework.filters import SearchFilter
+from reviews.models import Genre, Title, TitleGenre
+from reviews.search import full_text_search
 
-from django_filters.rest_framework import CharFilter, FilterSet
-from reviews.models import Title
+
+class FullTextSearchFilter(SearchFilter):
+    """Параметр `search` через полнотекстовый индекс модели."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        return full_text_search(queryset, text)
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    Дополняет сортировку полями Meta.ordering модели и id в направлении
+    первого поля: порядок становится однозначным и совпадает с составными
+    индексами (поле, name), так что первая страница читается по индексу.
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = list(qs.query.order_by)
+        desc = ordering[0].startswith('-')
+        used = {field.lstrip('-') for field in ordering}
+        for field in (*qs.model._meta.ordering, 'id'):
+            if field not in used:
+                ordering.append(f'-{field}' if desc else field)
+                used.add(field)
+        return qs.order_by(*ordering)
 
 
 class FilterTitle(FilterSet):
     category = CharFilter(field_name='category__slug', lookup_expr='iexact')
-    genre = CharFilter(field_name='genre__slug', lookup_expr='iexact')
-    name = CharFilter(field_name='name', lookup_expr='icontains')
+    genre = CharFilter(method='filter_genre')
+    genre_mode = ChoiceFilter(
+        choices=(('any', 'Любой из жанров'), ('all', 'Все жанры')),
+        method='filter_genre_mode',
+    )
+    name = CharFilter(method='filter_name')
+    ordering = IndexedOrderingFilter(fields=(
+        ('rating_avg', 'rating'),
+        ('year', 'year'),
+        ('name', 'name'),
+        ('rating_count', 'review_count'),
+    ))
 
     class Meta:
         model = Title
-        fields = ('year', 'category', 'genre', 'name')
+        fields = ('year', 'category', 'genre', 'genre_mode', 'name')
+
+    def filter_name(self, queryset, name, value):
+        return full_text_search(queryset, value)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        genre=a,b - произведения хотя бы с одним из жанров, с
+        genre_mode=all - со всеми. Slug переводятся в id одним запросом,
+        а произведения отбираются подзапросами EXISTS по индексу
+        (genre, title) таблицы связей, без JOIN, который размножает строки.
+        """
+        slugs = {slug.strip().lower() for slug in value.split(',')} - {''}
+        if not slugs:
+            return queryset
+        genre_ids = {}
+        for pk, slug in Genre.objects.filter(
+                reduce(or_, (Q(slug__iexact=slug) for slug in slugs))
+        ).values_list('pk', 'slug'):
+            genre_ids.setdefault(slug.lower(), []).append(pk)
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            groups = [genre_ids.get(slug) for slug in slugs]
+        else:
+            groups = [sum(genre_ids.values(), [])]
+        if not all(groups):
+            return queryset.none()
+        for ids in groups:
+            queryset = queryset.filter(Exists(TitleGenre.objects.filter(
+                title_id=OuterRef('pk'), genre_id__in=ids
+            )))
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        return queryset
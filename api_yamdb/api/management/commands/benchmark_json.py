@@ -0,0 +1,67 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import ReviewSerializer, TitlesSerializer
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость JSONRenderer и FastJSONRenderer на страницах '
+        'произведений и отзывов из базы (загрузите данные через load_csv).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size', type=int, default=100,
+            help='Сколько объектов на одной странице.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Сколько раз сериализовать каждую страницу.'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write(
+                'orjson не установлен, FastJSONRenderer работает как '
+                'JSONRenderer.'
+            )
+        size = options['page_size']
+        payloads = {
+            'titles': TitlesSerializer(
+                Title.objects.select_related('category')
+                .prefetch_related('genre').order_by('pk')[:size],
+                many=True,
+            ).data,
+            'reviews': ReviewSerializer(
+                Review.objects.select_related('author').order_by('pk')[:size],
+                many=True,
+            ).data,
+        }
+        if not all(payloads.values()):
+            raise CommandError('Нет данных: сначала выполните load_csv.')
+        for name, data in payloads.items():
+            results = {}
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                content = renderer.render(data)
+                started = perf_counter()
+                for _ in range(options['repeat']):
+                    renderer.render(data)
+                elapsed = perf_counter() - started
+                results[type(renderer).__name__] = (content, elapsed)
+                megabytes = len(content) / 2**20
+                self.stdout.write(
+                    f'{name}, {type(renderer).__name__}: '
+                    f'{options["repeat"] / elapsed:.0f} страниц/с, '
+                    f'{megabytes * options["repeat"] / elapsed:.1f} МБ/с'
+                )
+            (slow, slow_time), (fast, fast_time) = results.values()
+            if slow != fast:
+                raise CommandError(f'{name}: вывод рендереров различается.')
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: ускорение в {slow_time / fast_time:.1f} раза.'
+            ))
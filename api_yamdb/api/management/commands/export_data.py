@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.datasets import DATASETS, EXPORT_FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в CSV или NDJSON в раскладке static/data, '
+        'читая их порциями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*',
+            help=(
+                'Какие таблицы выгрузить (по умолчанию все): '
+                f'{", ".join(DATASETS)}.'
+            )
+        )
+        parser.add_argument(
+            '--format', default='csv', choices=EXPORT_FORMATS,
+            help='Формат файлов.'
+        )
+        parser.add_argument(
+            '--path', default='.',
+            help='Каталог для файлов; `-` — вывести в stdout.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['datasets'] or list(DATASETS)
+        unknown = set(names) - set(DATASETS)
+        if unknown:
+            raise CommandError(f'Неизвестные наборы данных: {unknown}.')
+        file_format = options['format']
+        for name in names:
+            dataset = DATASETS[name]
+            lines = export_lines(dataset, file_format)
+            if options['path'] == '-':
+                for line in lines:
+                    self.stdout.write(line, ending='')
+                continue
+            path = Path(options['path']) / Path(dataset.file).with_suffix(
+                f'.{file_format}'
+            )
+            with open(path, 'w', encoding='utf-8', newline='') as target:
+                target.writelines(lines)
+            self.stderr.write(f'{path}: готово.')
@@ -0,0 +1,158 @@
+import csv
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api.cache import EPOCH, bump_versions
+from api.datasets import DATA_DIR, DATASETS
+from reviews.search import SEARCH_FIELDS, rebuild_search_index
+
+
+class IdSet:
+    """Множество целых id в виде битовой карты: 1 бит на id."""
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, value):
+        byte = value >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1 + 1024))
+        self.bits[byte] |= 1 << (value & 7)
+
+    def __contains__(self, value):
+        byte = value >> 3
+        return (
+            0 <= byte < len(self.bits)
+            and bool(self.bits[byte] & (1 << (value & 7)))
+        )
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Позволяет сохранить pub_date из файла вместо текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV-файлы из static/data в базу пакетами через '
+        'bulk_create, по одной транзакции на файл. Внешние ключи '
+        'проверяются по множествам id в памяти, строки с неизвестными '
+        'ссылками и уже существующие строки пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'datasets', nargs='*',
+            help=(
+                'Какие файлы загрузить (по умолчанию все по порядку): '
+                f'{", ".join(DATASETS)}.'
+            )
+        )
+        parser.add_argument(
+            '--path', default=str(DATA_DIR),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять одним запросом.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['datasets'] or list(DATASETS)
+        unknown = set(names) - set(DATASETS)
+        if unknown:
+            raise CommandError(f'Неизвестные наборы данных: {unknown}.')
+        self.ids = {}
+        loaded_models = []
+        for name in DATASETS:
+            if name not in names:
+                continue
+            dataset = DATASETS[name]
+            try:
+                with open(f"{options['path']}/{dataset.file}",
+                          encoding='utf-8', newline='') as source:
+                    created, skipped = self.load(
+                        name, dataset, source, options['batch_size']
+                    )
+            except FileNotFoundError as error:
+                raise CommandError(error)
+            loaded_models.append(dataset.model)
+            self.stdout.write(
+                f'{dataset.file}: загружено {created}, пропущено {skipped}.'
+            )
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), loaded_models):
+                cursor.execute(sql)
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_title_stats', stdout=self.stdout)
+        for model in SEARCH_FIELDS:
+            rebuild_search_index(model)
+        bump_versions(EPOCH)
+
+    def get_ids(self, name):
+        if name not in self.ids:
+            ids = self.ids[name] = IdSet()
+            model = DATASETS[name].model
+            for pk in model.objects.values_list('pk', flat=True).iterator():
+                ids.add(pk)
+        return self.ids[name]
+
+    def load(self, name, dataset, source, batch_size):
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header != dataset.header:
+            raise CommandError(
+                f'{dataset.file}: ожидались столбцы {dataset.header}, '
+                f'получено {header}.'
+            )
+        model = dataset.model
+        fields = [
+            model._meta.get_field(attname) for attname in dataset.attnames
+        ]
+        references = [
+            (index, self.get_ids(dataset.references[field.attname]))
+            for index, field in enumerate(fields)
+            if field.attname in dataset.references
+        ]
+        loaded_ids = self.get_ids(name)
+        created = skipped = 0
+        batch = []
+        with transaction.atomic(), keep_auto_now_add(model):
+            for row in reader:
+                values = [
+                    field.to_python(value) if value or not field.null
+                    else None
+                    for field, value in zip(fields, row)
+                ]
+                if values[0] in loaded_ids or any(
+                        values[index] is not None
+                        and values[index] not in ids
+                        for index, ids in references):
+                    skipped += 1
+                    continue
+                loaded_ids.add(values[0])
+                batch.append(model(**dict(zip(dataset.attnames, values))))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch, batch_size)
+                    created += len(batch)
+                    batch = []
+            model.objects.bulk_create(batch, batch_size)
+            created += len(batch)
+        return created, skipped
@@ -1,13 +1,193 @@
-from rest_framework import mixins, viewsets
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.models import Review, Title
+from .cache import count_event, get_versions, table_version
+
+
+class ConditionalListMixin:
+    """
+    Условные GET-запросы для list. ETag и Last-Modified строятся из версий
+    данных в кэше (см. api.cache), поэтому проверка не обращается к базе
+    и не рендерит ответ. Если клиент прислал актуальный валидатор,
+    отдаётся 304.
+    """
+
+    def get_condition_names(self):
+        return (table_version(self.get_queryset().model),)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def conditional_response(self, method, request, *args, **kwargs):
+        versions = get_versions(*self.get_condition_names())
+        etag = '"{}"'.format(md5(repr((
+            versions, request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        )).encode()).hexdigest())
+        last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = method(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
 
-class CreateListDestroyMixin(CreateModelMixin, ListModelMixin,
-                    DestroyModelMixin, GenericViewSet):
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """Условные GET-запросы для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CreateListDestroyMixin(ConditionalListMixin, CreateModelMixin,
+                             ListModelMixin, DestroyModelMixin,
+                             GenericViewSet):
     pass
 
 
 class CreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     pass
+
+
+class FastReadMixin:
+    """
+    В list и retrieve отдаёт строки queryset.values() быстрому
+    сериализатору из api.fast_serializers, если он задан
+    в fast_read_serializer_class. Фильтры и пагинация работают как прежде.
+    """
+    fast_read_serializer_class = None
+
+    def use_fast_read(self):
+        return (
+            self.fast_read_serializer_class is not None
+            and self.action in ('list', 'retrieve')
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_fast_read():
+            queryset = self.fast_read_serializer_class.prepare(queryset)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.use_fast_read():
+            return self.fast_read_serializer_class
+        return super().get_serializer_class()
+
+
+class TitleResponseCacheMixin:
+    """
+    Кэширует ответы list и retrieve произведений по URL с параметрами.
+    Вместе с ответом хранятся версии всего, что в него попало: каждого
+    произведения, его категории и жанров, а для списков ещё и состава
+    каталога. Запись валидна, пока ни одна из версий не сменилась, поэтому
+    новый отзыв сбрасывает только карточку своего произведения и страницы
+    списка, на которых оно показано, а при сортировке по рейтингу - все
+    страницы списка.
+    """
+    response_cache_prefix = 'title-response'
+    rating_orderings = ('rating', 'review_count')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().list, self.get_list_names(), request, *args, **kwargs
+        )
+
+    def get_list_names(self):
+        """
+        При сортировке по рейтингу или числу отзывов любой отзыв может
+        переместить на страницу произведение, которого на ней не было,
+        поэтому такая страница зависит от всей таблицы отзывов.
+        """
+        ordering = self.request.query_params.get('ordering', '')
+        if any(field.strip().lstrip('-') in self.rating_orderings
+               for field in ordering.split(',')):
+            return ('titles', table_version(Review))
+        return ('titles',)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return self.cached_response(
+            super().retrieve, (f'title:{kwargs[lookup]}',),
+            request, *args, **kwargs
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.action in ('list', 'retrieve'):
+            self.rendered_objects = args[0]
+        return super().get_serializer(*args, **kwargs)
+
+    def get_response_dependencies(self, objects):
+        names = []
+        for title in objects:
+            if isinstance(title, dict):
+                pk, category_id = title['id'], title['category_id']
+                genre_ids = [genre[0] for genre in title['genres']]
+            else:
+                pk, category_id = title.pk, title.category_id
+                genre_ids = [genre.pk for genre in title.genre.all()]
+            names.append(f'title:{pk}')
+            if category_id is not None:
+                names.append(f'category:{category_id}')
+            names.extend(f'genre:{genre_id}' for genre_id in genre_ids)
+        return names
+
+    def cached_response(self, method, names, request, *args, **kwargs):
+        key = '{}:{}'.format(
+            self.response_cache_prefix,
+            md5(request.get_full_path().encode()).hexdigest()
+        )
+        entry = cache.get(key)
+        if entry is not None and (
+                get_versions(*entry['names']) == entry['versions']):
+            count_event('title-response-hit')
+            response = Response(entry['data'])
+            response['X-Cache'] = 'HIT'
+            return response
+        count_event('title-response-miss')
+        versions = get_versions(*names)
+        started = time.time_ns()
+        self.rendered_objects = ()
+        response = method(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            objects = self.rendered_objects
+            if isinstance(objects, (Title, dict)):
+                objects = (objects,)
+            extra = [
+                name for name in
+                dict.fromkeys(self.get_response_dependencies(objects))
+                if name not in names
+            ]
+            extra_versions = get_versions(*extra, created=started)[1:]
+            # версии зависимостей известны только после выборки: если
+            # какая-то сдвинулась уже после начала запроса, ответ мог
+            # собраться из старых данных и под новой версией храниться
+            # не должен
+            if all(version <= started for version in extra_versions):
+                cache.set(key, {
+                    'names': (*names, *extra),
+                    'versions': versions + extra_versions,
+                    'data': response.data,
+                }, settings.TITLE_RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,265 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import (EmptyResultSet, FieldDoesNotExist,
+                                    ValidationError)
+from django.db import connections
+from django.db.models import Lookup, Q
+from django.db.models.sql import Query
+from django.db.models.sql.where import WhereNode
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import get_versions, table_version
+
+
+def query_tables(query):
+    """
+    Таблицы запроса вместе с таблицами подзапросов в WHERE и аннотациях
+    (Exists, Subquery, pk__in=<queryset>). Таблицы полнотекстового поиска
+    в RawSQL не видны, но повторяют таблицу своей модели и меняются
+    вместе с ней.
+    """
+    tables = {join.table_name for join in query.alias_map.values()}
+    tables.add(query.get_meta().db_table)
+    nodes = [query.where, *query.annotations.values()]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Query):
+            tables |= query_tables(node)
+        elif isinstance(node, WhereNode):
+            nodes.extend(node.children)
+        elif isinstance(node, Lookup):
+            nodes.extend((node.lhs, node.rhs))
+        elif isinstance(getattr(node, 'query', None), Query):
+            tables |= query_tables(node.query)
+        elif hasattr(node, 'get_source_expressions'):
+            nodes.extend(node.get_source_expressions())
+    return tables
+
+
+class CachedCountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination, которая не считает COUNT(*) на каждый запрос.
+
+    Результат подсчёта кэшируется по SQL-запросу (то есть по эндпоинту и
+    набору фильтров) и версиям всех участвующих в нём таблиц, включая
+    таблицы подзапросов, которые сдвигаются при записи. Если БД умеет
+    оценивать число строк по плану запроса и оценка превышает
+    PAGINATION_COUNT_ESTIMATE_THRESHOLD, возвращается оценка вместо
+    точного значения.
+    """
+    count_cache_timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+    estimate_threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+
+    def get_count(self, queryset):
+        query = queryset.query
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return 0
+        tables = {table_version(queryset.model)}
+        tables.update(f'table:{table}' for table in query_tables(query))
+        versions = get_versions(*sorted(tables))
+        key = 'count:' + md5(
+            f'{queryset.db}:{sql}:{versions}'.encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = self.estimate_count(queryset)
+            if count is None or count < self.estimate_threshold:
+                count = super().get_count(queryset)
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def estimate_count(self, queryset):
+        if self.estimate_threshold is None:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу: позиция последнего элемента страницы
+    кодируется в курсор, а следующая страница выбирается условием
+    WHERE по полям сортировки модели и id без OFFSET и COUNT(*).
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 1000
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [(field, not desc) for field, desc in ordering]
+        queryset = queryset.order_by(*(
+            f'-{field}' if desc else field for field, desc in ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if limit <= 0:
+            return self.page_size
+        return min(limit, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        fields = []
+        for field in ordering:
+            fields.append((field.lstrip('-'), field.startswith('-')))
+        if not fields or fields[-1][0] not in ('id', 'pk'):
+            fields.append(('id', fields[0][1] if fields else False))
+        return fields
+
+    def after(self, ordering, position):
+        condition = Q()
+        equal = Q()
+        for (field, desc), value in zip(ordering, position):
+            lookup = 'lt' if desc else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_field(self, model, path):
+        """Поле модели по пути сортировки или None для аннотаций."""
+        field = None
+        for name in path.split('__'):
+            try:
+                field = (
+                    model._meta.pk if name == 'pk'
+                    else model._meta.get_field(name)
+                )
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model or model
+        return field if hasattr(field, 'to_python') else None
+
+    def decode_cursor(self, request, model):
+        """
+        Позиция из курсора, приведённая к типам полей сортировки: курсор
+        приходит от клиента, и значение не того типа должно давать 404,
+        а не ошибку при построении WHERE.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+                len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        values = []
+        for (path, _), value in zip(self.ordering, position):
+            field = self.get_field(model, path)
+            if field is not None:
+                if value is None and not field.null:
+                    raise NotFound(self.invalid_cursor_message)
+                try:
+                    value = field.to_python(value)
+                except (ValidationError, TypeError, ValueError):
+                    raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values, reverse
+
+    def encode_cursor(self, obj, reverse):
+        position = []
+        for field, _ in self.ordering:
+            if isinstance(obj, dict):
+                value = obj[field]
+            else:
+                value = getattr(obj, field)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            position.append(value)
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = b64encode(json.dumps(cursor).encode()).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.base_url, self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class LimitOffsetOrKeysetPagination(CachedCountLimitOffsetPagination):
+    """
+    CachedCountLimitOffsetPagination по умолчанию и KeysetPagination, если
+    в запросе передан параметр `cursor` (в том числе пустой — первая
+    страница).
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        cursor_param = self.keyset_pagination_class.cursor_query_param
+        if cursor_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -44,8 +44,8 @@ class AdminModeratorAuthorPermission(permissions.BasePermission):
 class IsStaffOrAuthorOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
     def has_object_permission(self, request, view, obj):
         return (
-                obj.author == request.user
-                or request.method in permissions.SAFE_METHODS
+                request.method in permissions.SAFE_METHODS
+                or obj.author == request.user
                 or request.user.is_authenticated
                 and request.user.is_admin
                 or request.user.is_authenticated
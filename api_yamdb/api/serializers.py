@@ -1,9 +1,15 @@
 from time import timezone
 
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from django.db.models import Q
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from reviews.models import Genre, Category, Title, Review, Comment
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+from reviews.models import (Genre, Category, Title, TitleGenre, TitleRanking,
+                            TitleStats, Review, Comment)
 from users.models import User
+from .cache import bump_versions, table_version
 
 
 class UsersSerializer(serializers.ModelSerializer):
@@ -55,16 +61,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        if self.context['request'].method != 'POST':
-            return data
-        author = self.context['request'].user
-        title_id = self.context['view'].kwargs.get('title_id')
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError(
-                'Вы уже написали ревью к этому произведению.'
-            )
-        return data
+
+class ReviewIngestSerializer(serializers.Serializer):
+    """Строка партнёрской выгрузки отзывов: автор - username."""
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150)
+    text = serializers.CharField()
+    score = serializers.IntegerField(max_value=10, min_value=1)
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -91,21 +94,122 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class SlugListField(ManyRelatedField):
+    """Список slug, который проверяется одним запросом IN."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        relation = self.child_relation
+        slugs = [relation.to_slug(item) for item in data]
+        found = relation.lookup(slugs)
+        for slug in slugs:
+            if slug not in found:
+                relation.fail(
+                    'does_not_exist', slug_name=relation.slug_field,
+                    value=slug
+                )
+        return [found[slug] for slug in slugs]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при many=True читает все объекты разом.
+    Если в context['slug_lookups'] для модели уже есть словарь
+    slug -> объект (массовая загрузка), запросов нет совсем.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugListField(**list_kwargs)
+
+    def to_slug(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        return smart_str(data)
+
+    def lookup(self, slugs):
+        queryset = self.get_queryset()
+        preloaded = self.context.get('slug_lookups', {}).get(queryset.model)
+        if preloaded is not None:
+            return {
+                slug: preloaded[slug] for slug in slugs if slug in preloaded
+            }
+        return {
+            smart_str(getattr(obj, self.slug_field)): obj
+            for obj in queryset.filter(**{f'{self.slug_field}__in': slugs})
+        }
+
+    def to_internal_value(self, data):
+        slug = self.to_slug(data)
+        found = self.lookup([slug])
+        if slug not in found:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=slug)
+        return found[slug]
+
+
 class TitlePostSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         slug_field="slug", many=True, queryset=Genre.objects.all()
     )
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         slug_field="slug", queryset=Category.objects.all()
     )
 
     class Meta:
-        fields = "__all__"
+        exclude = ("rating_sum", "rating_count", "rating_avg")
         model = Title
 
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = validated_data.pop('genre', [])
+        title = Title.objects.create(**validated_data)
+        self.set_genres(title, genres, created=True)
+        return title
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            self.set_genres(title, genres)
+        return title
+
+    @staticmethod
+    def set_genres(title, genres, created=False):
+        """
+        Меняет связи с жанрами одним DELETE и одним INSERT. bulk_create
+        не отправляет сигналов, поэтому версии кэша сдвигаются здесь.
+        """
+        wanted = {genre.pk for genre in genres}
+        current = set()
+        if not created:
+            current = set(
+                TitleGenre.objects.filter(title=title)
+                .values_list('genre_id', flat=True)
+            )
+        if current - wanted:
+            TitleGenre.objects.filter(
+                title=title, genre_id__in=current - wanted
+            ).delete()
+        if wanted - current:
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title=title, genre_id=genre_id)
+                for genre_id in wanted - current
+            )
+            bump_versions(
+                f'title:{title.pk}', 'titles', table_version(TitleGenre)
+            )
+
 
 class TitlesSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer()
 
@@ -134,6 +238,43 @@ class TitlesSerializer(serializers.ModelSerializer):
         return value
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.SerializerMethodField()
+    average = serializers.SerializerMethodField()
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'count', 'average', 'histogram')
+
+    def get_count(self, obj):
+        return sum(obj.histogram.values())
+
+    def get_average(self, obj):
+        count = self.get_count(obj)
+        if not count:
+            return None
+        total = sum(score * n for score, n in obj.histogram.items())
+        return round(total / count, 2)
+
+    def get_histogram(self, obj):
+        return {str(score): n for score, n in obj.histogram.items()}
+
+
+class RankedTitleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year')
+
+
+class TitleRankingSerializer(serializers.ModelSerializer):
+    title = RankedTitleSerializer()
+
+    class Meta:
+        model = TitleRanking
+        fields = ('position', 'score', 'review_count', 'title')
+
+
 class AuthSerializer(serializers.Serializer):
     username = serializers.CharField(
         validators=(UnicodeUsernameValidator(),),
@@ -147,16 +288,21 @@ class AuthSerializer(serializers.Serializer):
             raise serializers.ValidationError('Недопустимое имя пользователя.')
         return username
 
-    def validate_username(self, username):
-        if username.lower() == 'me':
-            raise serializers.ValidationError('Недопустимое имя пользователя.')
-        user = User.objects.filter(username=username).first()
-        if user and user.email != self.initial_data.get('email'):
-            raise serializers.ValidationError('Данный username занят.')
-        return username
-
-    def validate_email(self, email):
-        user = User.objects.filter(email=email).first()
-        if user and user.username != self.initial_data.get('username'):
-            raise serializers.ValidationError('Данный email уже используется.')
-        return email
+    def validate(self, data):
+        self.user = None
+        users = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        )[:2]
+        for user in users:
+            if user.username == data['username'] and (
+                    user.email == data['email']):
+                self.user = user
+            elif user.username == data['username']:
+                raise serializers.ValidationError(
+                    {'username': 'Данный username занят.'}
+                )
+            else:
+                raise serializers.ValidationError(
+                    {'email': 'Данный email уже используется.'}
+                )
+        return data
@@ -0,0 +1,76 @@
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save)
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre)
+from .cache import EPOCH, bump_versions, table_version
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_table_version(sender, **kwargs):
+    bump_versions(table_version(sender))
+
+
+@receiver(m2m_changed)
+def bump_through_table_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions(table_version(sender))
+
+
+@receiver(post_migrate)
+def bump_epoch(sender, **kwargs):
+    bump_versions(EPOCH)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def bump_title_version(sender, instance, **kwargs):
+    bump_versions(f'title:{instance.pk}', 'titles')
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def bump_title_genre_version(sender, instance, **kwargs):
+    bump_versions(f'title:{instance.title_id}', 'titles')
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def bump_title_genres_version(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_versions(f'title:{instance.pk}', 'titles')
+    elif pk_set:
+        bump_versions(*(f'title:{pk}' for pk in pk_set), 'titles')
+    else:
+        bump_versions(EPOCH)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_title_version(sender, instance, **kwargs):
+    bump_versions(
+        f'title:{instance.title_id}', f'reviews:{instance.title_id}'
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_version(sender, instance, **kwargs):
+    bump_versions(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def bump_catalog_version(sender, instance, **kwargs):
+    bump_versions(f'{sender._meta.model_name}:{instance.pk}')
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def bump_deleted_catalog_version(sender, instance, **kwargs):
+    # SET_NULL и каскад меняют произведения в обход их сигналов
+    bump_versions(f'{sender._meta.model_name}:{instance.pk}', 'titles')
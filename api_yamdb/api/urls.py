@@ -1,8 +1,21 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (APIGetToken, APISignup, GenreViewSet, CategoryViewSet, UsersViewSet,
-                    TitleViewSet, ReviewViewSet, CommentViewSet, signup)
+from api.views import (
+    APICacheStats,
+    APIExport,
+    APIGetToken,
+    APILeaderboard,
+    APIReviewIngest,
+    APIRevokeToken,
+    CategoryViewSet,
+    CommentViewSet,
+    GenreViewSet,
+    ReviewViewSet,
+    TitleViewSet,
+    UsersViewSet,
+    signup,
+)
 
 router = DefaultRouter()
 
@@ -10,11 +23,41 @@ router.register(r'titles', TitleViewSet, basename='titles')
 router.register(r'genres', GenreViewSet, basename='genres')
 router.register(r'categories', CategoryViewSet, basename='categories')
 router.register(r'users', UsersViewSet, basename='users')
-router.register(r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet, basename='reviews')
-router.register(r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments', CommentViewSet, basename='comments')
+router.register(
+    r'titles/(?P<title_id>\d+)/reviews', ReviewViewSet, basename='reviews'
+)
+router.register(
+    r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+    CommentViewSet,
+    basename='comments'
+)
 
 urlpatterns = [
     path('v1/auth/token/', APIGetToken.as_view(), name='get_token'),
+    path(
+        'v1/auth/token/revoke/',
+        APIRevokeToken.as_view(),
+        name='revoke_token'
+    ),
+    path(
+        'v1/reviews/ingest/',
+        APIReviewIngest.as_view(),
+        name='review_ingest'
+    ),
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', signup),
+    path(
+        'v1/leaderboards/', APILeaderboard.as_view(), name='leaderboard'
+    ),
+    path(
+        'v1/leaderboards/<str:scope>/<str:key>/',
+        APILeaderboard.as_view(),
+        name='leaderboard_scope'
+    ),
+    path('v1/cache/stats/', APICacheStats.as_view(), name='cache_stats'),
+    path(
+        'v1/export/<str:dataset>.<str:file_format>',
+        APIExport.as_view(),
+        name='export'
+    ),
 ]
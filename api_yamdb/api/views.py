@@ -1,33 +1,46 @@
 from http import HTTPStatus
-from django.db import IntegrityError
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, action
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.core.mail import EmailMessage, send_mail
-from reviews.models import Genre, Category, Title, Review
+from django.core.mail import EmailMessage
+from reviews.models import (Genre, Category, Title, TitleRanking, TitleStats,
+                            Review, Comment)
+from users.mail import send_email
 from users.models import User
-from rest_framework import permissions, status, viewsets, mixins, filters
-from rest_framework.decorators import action
+from rest_framework import permissions, status, viewsets, mixins
+from rest_framework.exceptions import (NotFound, UnsupportedMediaType,
+                                       ValidationError)
+from rest_framework.settings import api_settings
 from rest_framework.filters import SearchFilter
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import (GetTokenSerializer, NotAdminSerializer,
                           ReviewSerializer, CommentSerializer,
                           UsersSerializer, GenreSerializer,
                           CategorySerializer, TitlePostSerializer,
-                          TitlesSerializer, AuthSerializer)
-from .mixins import CreateListDestroyMixin
+                          TitlesSerializer, TitleStatsSerializer,
+                          TitleRankingSerializer, AuthSerializer)
+from .bulk import ReviewIngest, bulk_save_titles
+from .cache import get_counters, table_version
+from .fast_serializers import (CommentRowSerializer, ReviewRowSerializer,
+                               TitleRowSerializer)
+from .mixins import (ConditionalGetMixin, CreateListDestroyMixin,
+                     FastReadMixin, TitleResponseCacheMixin)
+from .parsers import FastJSONParser, NDJSONParser
+from .pagination import (CachedCountLimitOffsetPagination,
+                         LimitOffsetOrKeysetPagination)
 
-from .filters import FilterTitle
+from .authentication import RoleAccessToken, revoke_token
+from .datasets import DATASETS, EXPORT_FORMATS, export_lines
+from .filters import FilterTitle, FullTextSearchFilter
 from .permissions import (AdminOnly,
                           IsAdminUserOrReadOnly,
                           IsStaffOrAuthorOrReadOnly)
-from api_yamdb import settings
 
 
 class UsersViewSet(viewsets.ModelViewSet):
@@ -47,16 +60,17 @@ class UsersViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
         url_path='me')
     def get_current_user_info(self, request):
-        serializer = UsersSerializer(request.user)
+        user = get_object_or_404(User, pk=request.user.pk)
+        serializer = UsersSerializer(user)
         if request.method == 'PATCH':
-            if request.user.is_admin:
+            if user.is_admin:
                 serializer = UsersSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True)
             else:
                 serializer = NotAdminSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True)
             serializer.is_valid(raise_exception=True)
@@ -86,7 +100,7 @@ class APIGetToken(APIView):
                 {'username': 'Пользователь не найден!'},
                 status=status.HTTP_404_NOT_FOUND)
         if data.get('confirmation_code') == user.confirmation_code:
-            token = RefreshToken.for_user(user).access_token
+            token = RoleAccessToken.for_user(user)
             return Response({'token': str(token)},
                             status=status.HTTP_201_CREATED)
         return Response(
@@ -94,6 +108,18 @@ class APIGetToken(APIView):
             status=status.HTTP_400_BAD_REQUEST)
 
 
+class APIRevokeToken(APIView):
+    """
+    Отзыв текущего JWT токена (выход). Права доступа: Авторизованный
+    пользователь.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class APISignup(APIView):
     """
     Получить код подтверждения на переданный email. Права доступа: Доступно без
@@ -116,102 +142,299 @@ class APISignup(APIView):
         email.send()
 
 
+class APIExport(APIView):
+    """
+    Потоковая выгрузка таблицы в раскладке static/data.
+    Права доступа: Администратор. Пример запроса:
+    GET /api/v1/export/review.ndjson
+    """
+    permission_classes = (IsAuthenticated, AdminOnly,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, dataset, file_format):
+        if dataset not in DATASETS or file_format not in EXPORT_FORMATS:
+            raise NotFound('Нет такой выгрузки.')
+        response = StreamingHttpResponse(
+            export_lines(DATASETS[dataset], file_format),
+            content_type=self.content_types[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{file_format}"'
+        )
+        return response
+
+
+class APIReviewIngest(APIView):
+    """
+    Потоковая загрузка отзывов партнёров: NDJSON, по объекту
+    {"title": id, "author": username, "text": ..., "score": 1-10} на строку.
+    Тело читается построчно и сохраняется порциями по batch_size строк.
+    Права доступа: Администратор. Пример запроса:
+    POST /api/v1/reviews/ingest/?batch_size=1000
+    """
+    permission_classes = (IsAuthenticated, AdminOnly,)
+    parser_classes = (NDJSONParser,)
+
+    def post(self, request):
+        media_type = (request.content_type or '').split(';')[0].strip()
+        if media_type != NDJSONParser.media_type:
+            raise UnsupportedMediaType(media_type)
+        try:
+            batch_size = int(request.query_params.get(
+                'batch_size', settings.REVIEW_INGEST_BATCH_SIZE
+            ))
+        except ValueError:
+            raise ValidationError({'batch_size': 'Ожидается целое число.'})
+        if not 1 <= batch_size <= settings.REVIEW_INGEST_MAX_BATCH_SIZE:
+            raise ValidationError({
+                'batch_size': 'Допустимо от 1 до {}.'.format(
+                    settings.REVIEW_INGEST_MAX_BATCH_SIZE
+                )
+            })
+        ingest = ReviewIngest(batch_size, settings.REVIEW_INGEST_MAX_ERRORS)
+        return Response(ingest.run(request.stream or ()))
+
+
+class APICacheStats(APIView):
+    """
+    Счётчики попаданий и промахов кэша ответов о произведениях.
+    Права доступа: Администратор.
+    """
+    permission_classes = (IsAuthenticated, AdminOnly,)
+
+    def get(self, request):
+        counters = get_counters('title-response-hit', 'title-response-miss')
+        return Response({
+            'titles': {
+                'hits': counters['title-response-hit'],
+                'misses': counters['title-response-miss'],
+            }
+        })
+
+
+class APILeaderboard(APIView):
+    """
+    Таблица лидеров из заранее посчитанных мест (refresh_leaderboards).
+    Права доступа: Доступно без токена. Параметры запроса: metric
+    (rating, bayesian или reviews) и limit. Пример запроса:
+    GET /api/v1/leaderboards/genre/drama/?metric=bayesian&limit=10
+    """
+    permission_classes = (permissions.AllowAny,)
+    scope_models = {'genre': Genre, 'category': Category}
+
+    def get(self, request, scope='all', key=None):
+        metric = request.query_params.get('metric', 'rating')
+        if metric not in dict(TitleRanking.METRICS):
+            raise ValidationError({'metric': 'Неизвестный показатель.'})
+        try:
+            limit = min(
+                int(request.query_params.get('limit', 10)),
+                settings.LEADERBOARD_SIZE
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        if scope in self.scope_models:
+            scope_id = get_object_or_404(
+                self.scope_models[scope], slug=key
+            ).id
+        elif scope == 'year' and key.isdigit():
+            scope_id = int(key)
+        elif scope == 'all':
+            scope_id = 0
+        else:
+            raise NotFound('Нет такой таблицы лидеров.')
+        rankings = (
+            TitleRanking.objects.filter(
+                scope=scope, scope_id=scope_id, metric=metric
+            )
+            .select_related('title')
+            .order_by('position')[:max(limit, 0)]
+        )
+        return Response({
+            'scope': scope,
+            'metric': metric,
+            'results': TitleRankingSerializer(rankings, many=True).data,
+        })
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def signup(request):
     serializer = AuthSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.validated_data['username']
     email = serializer.validated_data['email']
+    user = serializer.user or User(
+        username=serializer.validated_data['username'], email=email
+    )
+    confirmation_code = default_token_generator.make_token(user)
     try:
-        User.objects.get_or_create(
-            username=username, email=email
-        )
+        if user.pk is None:
+            user.confirmation_code = confirmation_code
+            user.save()
+        else:
+            User.objects.filter(pk=user.pk).update(
+                confirmation_code=confirmation_code
+            )
     except IntegrityError:
         return Response(
             {'username': 'Пользователь с таким именем или почтой уже есть.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    user = get_object_or_404(User, username=username, email=email)
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    send_email(
         'Код подтверждения', f'Ваш код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [email],
-        fail_silently=False
+        [email]
     )
     return Response(serializer.validated_data, status=HTTPStatus.OK)
 
 
 class GenreViewSet(CreateListDestroyMixin):
     queryset = Genre.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = CachedCountLimitOffsetPagination
     serializer_class = GenreSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     lookup_field = 'slug'
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
-    search_fields = ('name', 'slug')
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter,)
     filterset_fields = ('name', 'slug')
 
 
 class CategoryViewSet(CreateListDestroyMixin):
     queryset = Category.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = CachedCountLimitOffsetPagination
     serializer_class = CategorySerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     lookup_field = 'slug'
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter,)
     filterset_fields = ('name', 'slug')
-    search_fields = ('name', 'slug')
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, TitleResponseCacheMixin,
+                   FastReadMixin, viewsets.ModelViewSet):
     serializer_class = TitlesSerializer
+    fast_read_serializer_class = TitleRowSerializer
     permission_classes = [IsAdminUserOrReadOnly, ]
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter,)
     filterset_class = FilterTitle
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
 
     def get_serializer_class(self):
         if self.action in ("retrieve", "list"):
-            return TitlesSerializer
+            return super().get_serializer_class()
         return TitlePostSerializer
 
     def get_queryset(self):
         if self.action in ('list', 'retrieve'):
             queryset = (
-                Title.objects.prefetch_related('reviews').all().
-                annotate(rating=Avg('reviews__score'))
+                Title.objects.select_related('category')
+                .prefetch_related('genre')
             )
             return queryset
+        if self.action == 'stats':
+            return Title.objects.select_related('stats')
         return Title.objects.all()
 
+    @action(
+        methods=['POST'], detail=False, url_path='bulk',
+        parser_classes=(FastJSONParser, NDJSONParser),
+    )
+    def bulk(self, request):
+        """
+        Массовое создание и изменение произведений: JSON-массив или NDJSON
+        (application/x-ndjson) в формате TitlePostSerializer. Элементы с id
+        изменяют существующие произведения. Ответ содержит результат для
+        каждого элемента: created, updated или error с ошибками.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Ожидается массив произведений.'
+            ]})
+        if len(items) > settings.TITLE_BULK_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Не больше {} произведений за запрос.'.format(
+                    settings.TITLE_BULK_MAX_ITEMS
+                )
+            ]})
+        return Response({'results': bulk_save_titles(items)})
+
+    @action(methods=['GET'], detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """Гистограмма оценок, число отзывов и средняя оценка."""
+        title = self.get_object()
+        stats = getattr(title, 'stats', None) or TitleStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_condition_names(self):
+        catalog = (table_version(Category), table_version(Genre))
+        if self.action == 'retrieve':
+            return (f'title:{self.kwargs["pk"]}', *catalog)
+        return ('titles', table_version(Review), *catalog)
+
+
+class ReviewViewSet(ConditionalGetMixin, FastReadMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    fast_read_serializer_class = ReviewRowSerializer
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    pagination_class = LimitOffsetOrKeysetPagination
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        title = self.get_title()
+        return Review.objects.filter(title_id=title.id).select_related(
+            'author'
+        )
+
+    def get_condition_names(self):
+        return (f'reviews:{self.kwargs["title_id"]}', table_version(User))
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        # повторный отзыв отсекает ограничение unique_author в базе;
+        # другие нарушения целостности (например, удалённый автор) -
+        # не повтор, их не маскируем
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    author=self.request.user, title=title).exists():
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы уже написали ревью к этому произведению.'
+            ]})
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, FastReadMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    fast_read_serializer_class = CommentRowSerializer
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    pagination_class = LimitOffsetOrKeysetPagination
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.all()
+        review = self.get_review()
+        return Comment.objects.filter(review_id=review.id).select_related(
+            'author'
+        )
+
+    def get_condition_names(self):
+        return (f'comments:{self.kwargs["review_id"]}', table_version(User))
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review=review)
\ No newline at end of file
+        serializer.save(author=self.request.user, review=self.get_review())
\ No newline at end of file
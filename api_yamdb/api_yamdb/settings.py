@@ -108,15 +108,47 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     # 'DEFAULT_FILTER_BACKENDS': [
     #     'django_filters.rest_framework.DjangoFilterBackend',
     # ],
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.LimitOffsetPagination',
+        'api.pagination.CachedCountLimitOffsetPagination',
     'PAGE_SIZE': 10,
+    # быстрый JSON на orjson (pip install orjson), без него - обычный json
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
+
+# по умолчанию кэш в памяти процесса - только для разработки: без DEBUG
+# проверка api.E001 требует общий для всех процессов бекенд (Redis,
+# Memcached). Вытеснение ключей безопасно: пропавшая версия создаётся
+# заново и даёт промах, а не устаревший ответ. Здесь же хранятся отметки
+# об отзыве JWT (api.authentication)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+# сколько секунд хранится закэшированный ответ о произведениях
+TITLE_RESPONSE_CACHE_TIMEOUT = 300
+
+# сколько секунд хранится результат COUNT(*) для постраничного вывода
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+# начиная с какой оценки по плану запроса не считать COUNT(*) точно
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100_000
 # бекенд для эмуляции отправки писем
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -124,6 +156,10 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 # почта для рассылки писем от сервиса
 DEFAULT_FROM_EMAIL = 'My Domain <noreply@yamdb.ru>'
 
+# как отправлять письма: через очередь (команда send_queued_emails)
+# или сразу в запросе — users.mail.SyncDispatcher
+EMAIL_DISPATCHER = 'users.mail.QueueDispatcher'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -131,4 +167,20 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'users.User'
 
+# сколько произведений можно передать в /api/v1/titles/bulk/ за раз
+TITLE_BULK_MAX_ITEMS = 10_000
+
+# загрузка отзывов /api/v1/reviews/ingest/: строк в одной транзакции
+# и сколько ошибок описывать в ответе
+REVIEW_INGEST_BATCH_SIZE = 500
+REVIEW_INGEST_MAX_BATCH_SIZE = 5000
+REVIEW_INGEST_MAX_ERRORS = 100
+
+# таблицы лидеров (команда refresh_leaderboards): сколько мест хранить,
+# сколько отзывов нужно для таблицы по средней оценке и вес общей средней
+# в байесовской оценке
+LEADERBOARD_SIZE = 100
+LEADERBOARD_MIN_REVIEWS = 3
+LEADERBOARD_PRIOR_WEIGHT = 10
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
@@ -2,8 +2,7 @@ from django.apps import AppConfig
 
 
 class ReviewsConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-
-
-class ReviewConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import search  # noqa: F401
@@ -0,0 +1,105 @@
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Title, TitleGenre, TitleRanking
+
+
+def keep_top(heap, item, size):
+    """
+    Держит в куче size лучших элементов (score, count, -title_id):
+    O(log size) на элемент, остальные строки в памяти не хранятся.
+    """
+    if len(heap) < size:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def title_genres(titles, links):
+    """
+    Соединяет два потока, упорядоченных по id произведения: строки
+    произведений и пары (title_id, genre_id). Выдаёт (строка, жанры).
+    """
+    link = next(links, None)
+    for row in titles:
+        genres = []
+        while link is not None and link[0] <= row[0]:
+            if link[0] == row[0]:
+                genres.append(link[1])
+            link = next(links, None)
+        yield row, genres
+
+
+def refresh_leaderboards(size=None, min_reviews=None, prior_weight=None):
+    """
+    Пересобирает TitleRanking по сохранённым счётчикам рейтинга: для
+    каждого среза и показателя хранится первые size мест. Средняя оценка
+    учитывает только произведения с min_reviews отзывами и больше;
+    байесовская тянет оценки с малым числом отзывов к общей средней с
+    весом prior_weight и не требует порога. Произведения читаются одним
+    проходом, в памяти - только первые size мест каждой таблицы.
+    Возвращает число строк.
+    """
+    size = size or settings.LEADERBOARD_SIZE
+    if min_reviews is None:
+        min_reviews = settings.LEADERBOARD_MIN_REVIEWS
+    if prior_weight is None:
+        prior_weight = settings.LEADERBOARD_PRIOR_WEIGHT
+
+    rated = Title.objects.filter(rating_count__gt=0)
+    totals = rated.aggregate(
+        total_sum=Sum('rating_sum'), total_count=Sum('rating_count')
+    )
+    total_count = totals['total_count'] or 0
+    mean = totals['total_sum'] / total_count if total_count else 0
+    titles = (
+        rated.order_by('id')
+        .values_list('id', 'year', 'category_id', 'rating_sum', 'rating_count')
+        .iterator()
+    )
+    links = (
+        TitleGenre.objects.filter(title__rating_count__gt=0)
+        .order_by('title_id')
+        .values_list('title_id', 'genre_id')
+        .iterator()
+    )
+
+    boards = defaultdict(list)
+    for row, genres in title_genres(titles, links):
+        title_id, year, category_id, score_sum, count = row
+        metrics = [
+            ('bayesian',
+             (prior_weight * mean + score_sum) / (prior_weight + count)),
+            ('reviews', count),
+        ]
+        if count >= min_reviews:
+            metrics.append(('rating', score_sum / count))
+        scopes = [('all', 0), ('year', year)]
+        if category_id is not None:
+            scopes.append(('category', category_id))
+        scopes.extend(('genre', genre_id) for genre_id in genres)
+        for scope, scope_id in scopes:
+            for metric, score in metrics:
+                keep_top(
+                    boards[scope, scope_id, metric],
+                    (score, count, -title_id), size,
+                )
+
+    rankings = [
+        TitleRanking(
+            scope=scope, scope_id=scope_id, metric=metric,
+            position=position, title_id=-title_id, score=score,
+            review_count=count,
+        )
+        for (scope, scope_id, metric), heap in boards.items()
+        for position, (score, count, title_id)
+        in enumerate(sorted(heap, reverse=True), 1)
+    ]
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        TitleRanking.objects.bulk_create(rankings, batch_size=1000)
+    return len(rankings)
@@ -0,0 +1,62 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from reviews.models import Comment, Review, Title, TitleGenre
+
+
+def hot_queries():
+    """
+    Запросы, которые выполняют ReviewViewSet, CommentViewSet
+    и FilterTitle.
+    """
+    title = Title.objects.order_by('pk').first()
+    review = Review.objects.order_by('pk').first()
+    genre_id = (
+        TitleGenre.objects.order_by('pk')
+        .values_list('genre_id', flat=True).first()
+    )
+    return {
+        'reviews of title': Review.objects.filter(
+            title_id=getattr(title, 'pk', 0)
+        ).order_by('-pub_date', '-id')[:10],
+        'comments of review': Comment.objects.filter(
+            review_id=getattr(review, 'pk', 0)
+        ).order_by('-pub_date', '-id')[:10],
+        'titles by year': Title.objects.filter(
+            year=getattr(title, 'year', 0)
+        ).order_by('name')[:10],
+        'titles by category': Title.objects.filter(
+            category_id=getattr(title, 'category_id', 0)
+        ).order_by('name')[:10],
+        'titles by genre': TitleGenre.objects.filter(
+            genre_id=genre_id or 0
+        ).values_list('title_id', flat=True),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время выполнения основных запросов к отзывам, '
+        'комментариям и произведениям. Запустите до и после '
+        '`migrate reviews 0005`, чтобы сравнить сканирование таблиц с '
+        'поиском по индексам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=100,
+            help='Сколько раз выполнить каждый запрос для замера времени.'
+        )
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        for name, queryset in hot_queries().items():
+            started = perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            elapsed = (perf_counter() - started) / repeat * 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {elapsed:.3f} мс'
+            ))
+            self.stdout.write(queryset.explain())
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import EPOCH, bump_versions
+from reviews.models import Title, recount_title_rating
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённый рейтинг всех произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recount_title_rating(Title.objects.all())
+        # update и bulk_create не отправляют сигналов
+        bump_versions(EPOCH)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import SEARCH_FIELDS, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс произведений, жанров и '
+        'категорий (нужно после загрузки данных в обход моделей).'
+    )
+
+    def handle(self, *args, **options):
+        for model in SEARCH_FIELDS:
+            rebuild_search_index(model)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import EPOCH, bump_versions
+from reviews.models import Title, TitleStats, recount_title_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает гистограммы оценок всех произведений одним '
+        'сгруппированным запросом к отзывам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк статистики вставлять одним запросом.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recount_title_stats(
+                Title.objects.all(), batch_size=options['batch_size']
+            )
+        # update и bulk_create не отправляют сигналов
+        bump_versions(EPOCH)
+        self.stdout.write(self.style.SUCCESS(
+            'Статистика оценок пересчитана для '
+            f'{TitleStats.objects.count()} произведений.'
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает таблицы лидеров по сохранённым рейтингам. Без '
+        '--interval выполняется один раз, с ним - периодически.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int,
+            help='Сколько мест хранить в каждой таблице.'
+        )
+        parser.add_argument(
+            '--min-reviews', type=int,
+            help='Сколько отзывов нужно для таблицы по средней оценке.'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Пересобирать каждые столько секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rows = refresh_leaderboards(
+                options['size'], options['min_reviews']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'Таблицы лидеров: {rows} мест.')
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+SEARCH_FIELDS = {
+    'reviews_title': ('name', 'description'),
+    'reviews_genre': ('name', 'slug'),
+    'reviews_category': ('name', 'slug'),
+}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    for table, fields in SEARCH_FIELDS.items():
+        columns = ', '.join(fields)
+        if connection.vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {table}_search USING fts5('
+                f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+            schema_editor.execute(
+                f'INSERT INTO {table}_search (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {table}'
+            )
+        elif connection.vendor == 'postgresql':
+            document = " || ' ' || ".join(
+                f"coalesce({field}, '')" for field in fields
+            )
+            schema_editor.execute(
+                f'CREATE INDEX {table}_search ON {table} '
+                f"USING gin (to_tsvector('simple', {document}))"
+            )
+    connection.__dict__.pop('_search_tables', None)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    for table in SEARCH_FIELDS:
+        if connection.vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_search')
+        elif connection.vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search')
+    connection.__dict__.pop('_search_tables', None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_titlestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год выхода')], max_length=8, verbose_name='Срез')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='Жанр, категория или год')),
+                ('metric', models.CharField(choices=[('rating', 'Средняя оценка'), ('bayesian', 'Байесовская средняя оценка'), ('reviews', 'Число отзывов')], max_length=8, verbose_name='Показатель')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Значение показателя')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество оценок')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'metric', 'position'), name='titleranking_position_unique'),
+        ),
+    ]
@@ -1,20 +1,13 @@
+from collections import Counter, defaultdict
 from datetime import date
 from users.models import User
-from django.db.models.signals import post_save
+from django.db.models import (Case, Count, F, FloatField, IntegerField,
+                              OuterRef, Q, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from django.contrib.auth.tokens import default_token_generator
-
-
-@receiver(post_save, sender=User)
-def post_save(sender, instance, created, **kwargs):
-    if created:
-        confirmation_code = default_token_generator.make_token(
-            instance
-        )
-        instance.confirmation_code = confirmation_code
-        instance.save()
+from django.db import IntegrityError, models, transaction
 
 
 class Category(models.Model):
@@ -62,12 +55,48 @@ class Title(models.Model):
         blank=True,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False,
+    )
+    # средняя оценка для сортировки; 0 - оценок ещё нет
+    rating_avg = models.FloatField(
+        'Средняя оценка',
+        default=0,
+        editable=False,
+    )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+            models.Index(
+                fields=['category', 'name'], name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=['rating_avg', 'name'], name='title_rating_avg_name_idx'
+            ),
+            models.Index(
+                fields=['rating_count', 'name'],
+                name='title_rating_count_name_idx'
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -106,9 +135,219 @@ class Review(models.Model):
             )
         ]
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Review'
 
 
+SCORES = range(1, 11)
+
+
+class TitleStats(models.Model):
+    """Сколько раз произведению поставили каждую из оценок 1-10."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение',
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+
+def update_title_stats(title_id, score, delta):
+    """
+    Атомарно сдвигает счётчик одной оценки. Строка статистики создаётся
+    при первой оценке; произведения, загруженные в обход сигналов,
+    досчитывает команда rebuild_title_stats.
+    """
+    field = f'score_{score}'
+    stats = TitleStats.objects.filter(title_id=title_id)
+    if stats.update(**{field: F(field) + delta}) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleStats.objects.create(title_id=title_id, **{field: delta})
+    except IntegrityError:
+        stats.update(**{field: F(field) + delta})
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигает сохранённые сумму, количество и среднюю оценку."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+        rating_avg=Case(
+            When(rating_count=-count_delta, then=Value(0.0)),
+            default=(
+                Cast(F('rating_sum') + score_delta, FloatField())
+                / (F('rating_count') + count_delta)
+            ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def per_title(lookup, values):
+    """Выражение со своим значением для каждого произведения, иначе 0."""
+    return Case(
+        *(When(**{lookup: pk}, then=Value(value))
+          for pk, value in values.items() if value),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def add_review_scores(reviews):
+    """
+    Добавляет оценки новых отзывов (созданных bulk_create, без сигналов)
+    к рейтингу и гистограммам их произведений. Сдвиги считаются в памяти
+    и применяются через F() тремя запросами при любом числе произведений,
+    поэтому стоимость зависит от числа новых отзывов, а не от всех
+    отзывов произведения. Вызывать внутри транзакции.
+    """
+    scores = defaultdict(Counter)
+    for review in reviews:
+        scores[review.title_id][review.score] += 1
+    if not scores:
+        return
+    sums = {
+        pk: sum(score * count for score, count in counter.items())
+        for pk, counter in scores.items()
+    }
+    counts = {pk: sum(counter.values()) for pk, counter in scores.items()}
+    Title.objects.filter(pk__in=scores).update(
+        rating_sum=F('rating_sum') + per_title('pk', sums),
+        rating_count=F('rating_count') + per_title('pk', counts),
+        rating_avg=(
+            Cast(F('rating_sum') + per_title('pk', sums), FloatField())
+            / (F('rating_count') + per_title('pk', counts))
+        ),
+    )
+    TitleStats.objects.bulk_create(
+        (TitleStats(title_id=pk) for pk in scores), ignore_conflicts=True
+    )
+    TitleStats.objects.filter(title_id__in=scores).update(**{
+        f'score_{score}': F(f'score_{score}') + per_title('title_id', {
+            pk: counter[score] for pk, counter in scores.items()
+        })
+        for score in {score for counter in scores.values()
+                      for score in counter}
+    })
+
+
+def recount_title_rating(titles):
+    """
+    Пересчитывает по отзывам сохранённый рейтинг произведений queryset
+    titles и возвращает их число. Вызывать внутри транзакции.
+    """
+    reviews = (
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(
+                reviews.annotate(total=Sum('score')).values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        rating_count=Coalesce(
+            Subquery(
+                reviews.annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    )
+    titles.update(rating_avg=Case(
+        When(rating_count=0, then=Value(0.0)),
+        default=Cast('rating_sum', FloatField()) / F('rating_count'),
+        output_field=FloatField(),
+    ))
+    return updated
+
+
+def recount_title_stats(titles, batch_size=None):
+    """
+    Пересчитывает гистограммы оценок произведений queryset titles одним
+    сгруппированным запросом к отзывам. Вызывать внутри транзакции.
+    """
+    fields = [f'score_{score}' for score in SCORES]
+    rows = titles.order_by().annotate(**{
+        f'score_{score}': Count('reviews', filter=Q(reviews__score=score))
+        for score in SCORES
+    }).values_list('pk', *fields)
+    TitleStats.objects.filter(title__in=titles).delete()
+    TitleStats.objects.bulk_create(
+        (
+            TitleStats(title_id=pk, **dict(zip(fields, counts)))
+            for pk, *counts in rows.iterator()
+        ),
+        batch_size=batch_size,
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list('title_id', 'score')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(instance.title_id, instance.score, 1)
+        return
+    previous_title_id, previous_score = previous
+    if previous_title_id != instance.title_id:
+        update_title_rating(previous_title_id, -previous_score, -1)
+        update_title_rating(instance.title_id, instance.score, 1)
+    elif previous_score != instance.score:
+        update_title_rating(
+            instance.title_id, instance.score - previous_score, 0
+        )
+    else:
+        return
+    update_title_stats(previous_title_id, previous_score, -1)
+    update_title_stats(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, -instance.score, -1)
+    update_title_stats(instance.title_id, instance.score, -1)
+
+
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
     author = models.ForeignKey(
@@ -130,8 +369,62 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
 
 class TitleGenre(models.Model):
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='titlegenre_genre_title_idx'
+            ),
+        ]
+
+
+class TitleRanking(models.Model):
+    """
+    Место произведения в одной из таблиц лидеров. Таблицу целиком
+    пересобирает команда refresh_leaderboards.
+    """
+    SCOPES = (
+        ('all', 'Все произведения'),
+        ('genre', 'Жанр'),
+        ('category', 'Категория'),
+        ('year', 'Год выхода'),
+    )
+    METRICS = (
+        ('rating', 'Средняя оценка'),
+        ('bayesian', 'Байесовская средняя оценка'),
+        ('reviews', 'Число отзывов'),
+    )
+    scope = models.CharField('Срез', max_length=8, choices=SCOPES)
+    scope_id = models.PositiveIntegerField(
+        'Жанр, категория или год', default=0
+    )
+    metric = models.CharField('Показатель', max_length=8, choices=METRICS)
+    position = models.PositiveIntegerField('Место')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Произведение',
+    )
+    score = models.FloatField('Значение показателя')
+    review_count = models.PositiveIntegerField('Количество оценок')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'metric', 'position'],
+                name='titleranking_position_unique',
+            )
+        ]
+        verbose_name = 'Место в рейтинге'
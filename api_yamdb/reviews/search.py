@@ -0,0 +1,152 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import Category, Genre, Title
+
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Genre: ('name', 'slug'),
+    Category: ('name', 'slug'),
+}
+TOKEN_RE = re.compile(r'\w+')
+
+
+def search_table(model):
+    return f'{model._meta.db_table}_search'
+
+
+def has_search_table(connection, model):
+    tables = getattr(connection, '_search_tables', None)
+    if tables is None:
+        tables = connection._search_tables = {
+            name for name in connection.introspection.table_names()
+            if name.endswith('_search')
+        }
+    return search_table(model) in tables
+
+
+def tsvector_sql(model):
+    """Выражение, по которому построен GIN-индекс в PostgreSQL."""
+    document = " || ' ' || ".join(
+        f"coalesce({field}, '')" for field in SEARCH_FIELDS[model]
+    )
+    return f"to_tsvector('simple', {document})"
+
+
+def full_text_search(queryset, text):
+    """
+    Фильтрует queryset по словам из text (все слова, поиск по префиксу).
+    В SQLite используется виртуальная таблица FTS5, в PostgreSQL —
+    индекс по tsvector, в остальных СУБД — icontains по тем же полям.
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return queryset
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and has_search_table(connection, model):
+        table = search_table(model)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+            [' '.join(f'"{token}"*' for token in tokens)],
+        ))
+    if connection.vendor == 'postgresql':
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM {model._meta.db_table} '
+            f"WHERE {tsvector_sql(model)} @@ to_tsquery('simple', %s)",
+            [' & '.join(f'{token}:*' for token in tokens)],
+        ))
+    condition = Q()
+    for token in tokens:
+        condition &= Q(*(
+            Q(**{f'{field}__icontains': token})
+            for field in SEARCH_FIELDS[model]
+        ), _connector=Q.OR)
+    return queryset.filter(condition)
+
+
+def rebuild_search_index(model, using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not has_search_table(
+            connection, model):
+        return
+    table = search_table(model)
+    fields = ', '.join(SEARCH_FIELDS[model])
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, {fields}) '
+            f'SELECT id, {fields} FROM {model._meta.db_table}'
+        )
+
+
+def index_objects(model, pks, using='default', chunk_size=500):
+    """Переиндексирует объекты, записанные в обход сигналов (bulk_create)."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not has_search_table(
+            connection, model):
+        return
+    table = search_table(model)
+    fields = ', '.join(SEARCH_FIELDS[model])
+    pks = list(pks)
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start:start + chunk_size]
+            placeholders = ', '.join('%s' for _ in chunk)
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid IN ({placeholders})', chunk
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {fields}) '
+                f'SELECT id, {fields} FROM {model._meta.db_table} '
+                f'WHERE id IN ({placeholders})',
+                chunk,
+            )
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def index_object(sender, instance, using, **kwargs):
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not has_search_table(
+            connection, sender):
+        return
+    table = search_table(sender)
+    fields = SEARCH_FIELDS[sender]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+            f'VALUES (%s, {", ".join("%s" for _ in fields)})',
+            [instance.pk, *(getattr(instance, field) for field in fields)],
+        )
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def unindex_object(sender, instance, using, **kwargs):
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not has_search_table(
+            connection, sender):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {search_table(sender)} WHERE rowid = %s',
+            [instance.pk],
+        )
+
+
+@receiver(post_migrate)
+def rebuild_after_migrate(sender, using, **kwargs):
+    if sender.name != 'reviews':
+        return
+    connections[using].__dict__.pop('_search_tables', None)
+    for model in SEARCH_FIELDS:
+        rebuild_search_index(model, using)
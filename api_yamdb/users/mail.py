@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import QueuedEmail
+
+
+class SyncDispatcher:
+    """Отправляет письмо сразу, в рамках текущего запроса."""
+
+    def send(self, subject, body, from_email, recipients):
+        send_mail(subject, body, from_email, recipients, fail_silently=False)
+
+
+class QueueDispatcher:
+    """Кладёт письмо в очередь; отправляет его команда send_queued_emails."""
+
+    def send(self, subject, body, from_email, recipients):
+        QueuedEmail.objects.create(
+            subject=subject, body=body, from_email=from_email,
+            to=list(recipients),
+        )
+
+
+def send_email(subject, body, recipients, from_email=None):
+    dispatcher = import_string(settings.EMAIL_DISPATCHER)()
+    dispatcher.send(
+        subject, body, from_email or settings.DEFAULT_FROM_EMAIL, recipients
+    )
+
+
+def claim_queued_emails(batch_size, max_attempts, claim_timeout):
+    """
+    Забирает порцию писем короткой транзакцией: помечает их занятыми на
+    claim_timeout секунд, чтобы другие отправители их пропустили. Если
+    отправитель упадёт, письма снова станут доступны после этого срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(sent__isnull=True, attempts__lt=max_attempts)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+            .order_by('attempts', 'id')[:batch_size]
+        )
+        QueuedEmail.objects.filter(
+            pk__in=[email.pk for email in batch]
+        ).update(claimed_until=now + timedelta(seconds=claim_timeout))
+    return batch
+
+
+def send_queued_emails(batch_size=100, max_attempts=5, claim_timeout=300):
+    """
+    Отправляет одну порцию писем из очереди через одно соединение
+    с почтовым сервером. Письма забираются и результаты записываются
+    отдельными короткими транзакциями; на время обмена с SMTP-сервером
+    транзакция не держится. Возвращает число отправленных и неудачных
+    писем.
+    """
+    batch = claim_queued_emails(batch_size, max_attempts, claim_timeout)
+    if not batch:
+        return 0, 0
+    sent, failed = [], []
+    with get_connection() as connection:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.to,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failed.append((email.pk, str(error)))
+            else:
+                sent.append(email.pk)
+    with transaction.atomic():
+        QueuedEmail.objects.filter(pk__in=sent).update(
+            sent=timezone.now(), attempts=F('attempts') + 1, error='',
+            claimed_until=None,
+        )
+        for pk, error in failed:
+            QueuedEmail.objects.filter(pk=pk).update(
+                attempts=F('attempts') + 1, error=error, claimed_until=None
+            )
+    return len(sent), len(failed)
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.mail import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди порциями через одно SMTP-соединение. '
+        'Без --once работает постоянно, опрашивая очередь.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='После стольких неудач письмо больше не отправляется.'
+        )
+        parser.add_argument(
+            '--claim-timeout', type=float, default=300,
+            help=(
+                'На сколько секунд письма закрепляются за отправителем; '
+                'после падения отправителя их заберёт другой.'
+            )
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить всё, что есть в очереди, и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_queued_emails(
+                    options['batch_size'], options['max_attempts'],
+                    options['claim_timeout'],
+                )
+            except Exception as error:
+                if options['once']:
+                    raise
+                self.stderr.write(f'Ошибка отправки: {error}')
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}.'
+                )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
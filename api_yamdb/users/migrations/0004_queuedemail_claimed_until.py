@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_revokedtoken_tokens_valid_after'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Занято отправителем до'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_queuedemail_claimed_until'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='tokens_valid_after',
+        ),
+        migrations.DeleteModel(
+            name='RevokedToken',
+        ),
+    ]
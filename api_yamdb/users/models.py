@@ -28,3 +28,32 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class QueuedEmail(models.Model):
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст письма')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.JSONField('Получатели')
+    created = models.DateTimeField('Поставлено в очередь', auto_now_add=True)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попытки отправки', default=0)
+    error = models.TextField('Последняя ошибка', blank=True)
+    claimed_until = models.DateTimeField(
+        'Занято отправителем до', null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['attempts', 'id'],
+                name='queuedemail_pending_idx',
+                condition=models.Q(sent__isnull=True),
+            ),
+        ]
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(admin_client, title_id, 'review 1', 2)
+        response = create_single_review(user_client, title_id, 'review 2', 8)
+        review_id = response.json()['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        moderator_client.patch(f'{url}{review_id}/', data={'score': 10})
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        moderator_client.delete(f'{url}{review_id}/')
+        assert self.get_rating(admin_client, title_id) == 2, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'review 1', 3)
+        create_single_review(user_client, title_id, 'review 2', 6)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (9, 2), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'сумму и количество оценок по отзывам.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating_count == 0
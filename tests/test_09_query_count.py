@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+from tests.utils import create_catalog
+
+
+def client_genres(client, url):
+    return [genre['slug'] for genre in client.get(url).json()['genre']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize('page_size', (1, 10, 50))
+    def test_01_title_list(self, client, django_assert_num_queries,
+                           page_size):
+        create_catalog(50)
+        url = f'/api/v1/titles/?limit={page_size}'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(len(title['genre']) == 3 for title in results), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит жанры '
+            'произведений.'
+        )
+
+    def test_02_title_detail(self, client, django_assert_num_queries):
+        titles = create_catalog(2)
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category'] == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+
+    @pytest.mark.parametrize('fast_read', (True, False))
+    @pytest.mark.parametrize('page_size', (10, 100, 1000))
+    def test_03_review_and_comment_lists(self, client, monkeypatch,
+                                         django_assert_num_queries,
+                                         page_size, fast_read):
+        from api.views import CommentViewSet, ReviewViewSet
+        from reviews.models import Comment
+
+        if not fast_read:
+            for viewset in (ReviewViewSet, CommentViewSet):
+                monkeypatch.setattr(
+                    viewset, 'fast_read_serializer_class', None
+                )
+        title = create_catalog(1, genres_per_title=1,
+                               reviews_per_title=page_size)[0]
+        review = title.reviews.first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=other.author, text='text')
+            for other in title.reviews.all()
+        )
+        for url in (
+                f'/api/v1/titles/{title.id}/reviews/?limit={page_size}',
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+                f'?limit={page_size}'):
+            with django_assert_num_queries(3):
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            results = response.json()['results']
+            assert len(results) == page_size
+            assert all(item['author'].startswith('author')
+                       for item in results), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'username автора.'
+            )
+
+    def test_04_title_write_genres(self, admin_client,
+                                   django_assert_num_queries):
+        from reviews.models import Genre
+
+        create_catalog(1, genres_per_title=20)
+        genres = list(Genre.objects.values_list('slug', flat=True))
+        url = '/api/v1/titles/'
+        admin_client.get(url)
+        counts = []
+        for size in (1, 20):
+            with django_assert_num_queries(9, exact=False) as context:
+                response = admin_client.post(url, data={
+                    'name': f'Жанров: {size}', 'year': 2000,
+                    'category': 'films', 'genre': genres[:size],
+                })
+            assert response.status_code == HTTPStatus.CREATED
+            assert len(response.json()['genre']) == size
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов при POST-запросе к `{url}` не '
+            'зависит от количества жанров.'
+        )
+
+        title_url = f'{url}{response.json()["id"]}/'
+        counts = []
+        for new_genres in (genres[10:], genres[:2]):
+            with django_assert_num_queries(13, exact=False) as context:
+                response = admin_client.patch(
+                    title_url, data={'genre': new_genres}, format='json'
+                )
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['genre'] == new_genres
+            assert client_genres(admin_client, title_url) == new_genres
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов при PATCH-запросе к `{url}` не '
+            'зависит от количества жанров.'
+        )
+
+        response = admin_client.patch(
+            title_url, data={'genre': ['genre-0', 'unknown']}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'unknown' in response.json()['genre'][0]
+
+    def test_05_signup_single_write(self, client, django_user_model,
+                                    django_assert_num_queries):
+        url = '/api/v1/auth/signup/'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        with django_assert_num_queries(2):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        user = django_user_model.objects.get(username=data['username'])
+        assert user.confirmation_code, (
+            f'Проверьте, что POST-запрос к `{url}` сохраняет код '
+            'подтверждения при создании пользователя.'
+        )
+
+        with django_assert_num_queries(2):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        code = django_user_model.objects.get(pk=user.pk).confirmation_code
+        assert code in mail.outbox[-1].body
+        response = client.post(
+            '/api/v1/auth/token/',
+            data={'username': data['username'], 'confirmation_code': code}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после повторного запроса кода подтверждения '
+            'токен выдаётся по последнему отправленному коду.'
+        )
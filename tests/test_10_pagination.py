@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что при постраничном выводе по курсору ответ '
+            'не содержит ключ `count`.'
+        )
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        create_catalog(25, genres_per_title=1, reviews_per_title=1)
+        Title.objects.filter(pk__lte=10).update(name='Одинаковое название')
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+
+        pages = walk(client, '/api/v1/titles/?cursor=&limit=10')
+        assert [len(page['results']) for page in pages] == [10, 10, 5]
+        ids = [title['id'] for page in pages for title in page['results']]
+        assert ids == expected, (
+            'Проверьте, что постраничный вывод по курсору для '
+            '`/api/v1/titles/` сохраняет сортировку модели и не теряет '
+            'произведения с одинаковым названием.'
+        )
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[2]['previous'])
+        data = response.json()
+        assert [title['id'] for title in data['results']] == expected[10:20]
+        assert data['next'] and data['previous']
+
+    def test_02_reviews_cursor(self, client):
+        from django.utils import timezone
+
+        from reviews.models import Review
+
+        titles = create_catalog(1, genres_per_title=1, reviews_per_title=7)
+        Review.objects.update(pub_date=timezone.now())
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+        url = f'/api/v1/titles/{titles[0].id}/reviews/?cursor=&limit=3'
+        pages = walk(client, url)
+        ids = [review['id'] for page in pages for review in page['results']]
+        assert ids == expected
+
+    def test_03_invalid_cursor(self, client):
+        import base64
+        import json
+
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        titles = create_catalog(1, genres_per_title=0, reviews_per_title=1)
+        for position in (['x', 'y'], [None, 1], [{}, []]):
+            cursor = base64.b64encode(
+                json.dumps({'p': position}).encode()
+            ).decode()
+            for url in ('/api/v1/titles/',
+                        f'/api/v1/titles/{titles[0].id}/reviews/'):
+                response = client.get(url, {'cursor': cursor})
+                assert response.status_code == HTTPStatus.NOT_FOUND, (
+                    f'Проверьте, что GET-запрос к `{url}` с курсором '
+                    f'{position} возвращает статус 404.'
+                )
+
+    def test_04_limit_offset_by_default(self, client):
+        create_catalog(3, genres_per_title=1, reviews_per_title=1)
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CachedCount:
+
+    def test_01_count_is_cached(self, client, django_assert_num_queries):
+        create_catalog(3, genres_per_title=1, reviews_per_title=1)
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 3
+        # другой URL, чтобы ответ не взялся целиком из кэша ответов
+        url = '/api/v1/titles/?offset=0'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.json()['count'] == 3, (
+            f'Проверьте, что повторный GET-запрос к `{url}` берёт `count` '
+            'из кэша.'
+        )
+
+    def test_02_count_invalidated_on_write(self, client, admin_client):
+        from reviews.models import Title
+
+        create_catalog(3, genres_per_title=1, reviews_per_title=1)
+        url = '/api/v1/titles/?year=2000'
+        assert client.get(url).json()['count'] == 3
+        title = Title.objects.first()
+        title.year = 1999
+        title.save()
+        assert client.get(url).json()['count'] == 2, (
+            f'Проверьте, что `count` в ответе на GET-запрос к `{url}` '
+            'пересчитывается после изменения данных.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+
+    def test_03_subquery_filters_invalidated(self, client):
+        from reviews.models import Genre, Title
+
+        titles = create_catalog(2, genres_per_title=0, reviews_per_title=0)
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        titles[0].genre.add(genre)
+        url = '/api/v1/titles/?genre=drama'
+        assert client.get(url).json()['count'] == 1
+        titles[1].genre.add(genre)
+        data = client.get(url).json()
+        assert data['count'] == len(data['results']) == 2, (
+            f'Проверьте, что `count` в ответе на GET-запрос к `{url}` '
+            'пересчитывается после изменения жанров произведения.'
+        )
+
+        url = '/api/v1/titles/?name=Новинка'
+        assert client.get(url).json()['count'] == 0
+        Title.objects.create(name='Новинка', year=2000)
+        assert client.get(url).json()['count'] == 1
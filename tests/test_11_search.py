@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+def names(response):
+    assert response.status_code == HTTPStatus.OK
+    return {item['name'] for item in response.json()['results']}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11FullTextSearch:
+
+    def test_01_title_name_filter(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        assert names(client.get(f'{url}?name=терминатор')) == {'Терминатор'}
+        assert names(client.get(f'{url}?name=Крепк')) == {'Крепкий орешек'}, (
+            f'Проверьте, что фильтр `name` для `{url}` находит произведения '
+            'по началу слова.'
+        )
+        assert names(client.get(f'{url}?search=back')) == {'Терминатор'}, (
+            f'Проверьте, что параметр `search` для `{url}` ищет и по '
+            'описанию произведения.'
+        )
+        assert names(client.get(f'{url}?name=орешек+крепкий')) == {
+            'Крепкий орешек'
+        }
+        assert names(client.get(f'{url}?name=орешек+терминатор')) == set()
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        admin_client.patch(
+            f'{url}{titles[0]["id"]}/', data={'name': 'Хищник'}
+        )
+        assert names(client.get(f'{url}?name=Терминатор')) == set()
+        assert names(client.get(f'{url}?name=Хищник')) == {'Хищник'}
+
+        admin_client.delete(f'{url}{titles[0]["id"]}/')
+        assert names(client.get(f'{url}?name=Хищник')) == set()
+
+    def test_03_genre_and_category_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert names(client.get('/api/v1/genres/?search=ужас')) == {'Ужасы'}
+        assert names(client.get('/api/v1/genres/?search=drama')) == {'Драма'}
+        assert names(client.get('/api/v1/categories/?search=книг')) == {
+            'Книги'
+        }
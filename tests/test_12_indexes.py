@@ -0,0 +1,28 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='план запроса в формате SQLite'
+)
+class Test12HotPathIndexes:
+
+    @pytest.mark.parametrize('name, index', (
+        ('reviews of title', 'review_title_pub_date_idx'),
+        ('comments of review', 'comment_review_pub_date_idx'),
+        ('titles by year', 'title_year_name_idx'),
+        ('titles by category', 'title_category_name_idx'),
+        ('titles by genre', 'titlegenre_genre_title_idx'),
+    ))
+    def test_01_query_uses_index(self, name, index):
+        from reviews.management.commands.query_plans import hot_queries
+
+        plan = hot_queries()[name].explain()
+        assert f'INDEX {index}' in plan, (
+            f'Проверьте, что запрос `{name}` использует индекс `{index}`.'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что запрос `{name}` не сортирует строки отдельно '
+            'от индекса.'
+        )
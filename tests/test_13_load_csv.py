@@ -0,0 +1,39 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13LoadCSV:
+
+    def test_01_load_static_data(self):
+        from reviews.models import Comment, Review, Title, TitleGenre
+        from users.models import User
+
+        call_command('load_csv', batch_size=10, stdout=StringIO())
+
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert TitleGenre.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (20, 2), (
+            'Проверьте, что после загрузки CSV пересчитывается рейтинг '
+            'произведений.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что `pub_date` берётся из файла, а не заменяется '
+            'текущим временем.'
+        )
+
+    def test_02_load_is_idempotent(self):
+        from reviews.models import Review
+
+        call_command('load_csv', stdout=StringIO())
+        out = StringIO()
+        call_command('load_csv', 'review', stdout=out)
+        assert Review.objects.count() == 72
+        assert 'review.csv: загружено 0, пропущено 72.' in out.getvalue()
@@ -0,0 +1,52 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+DATA_DIR = 'api_yamdb/static/data'
+
+
+def read_source(name):
+    with open(f'{DATA_DIR}/{name}.csv', encoding='utf-8', newline='') as f:
+        header, *rows = csv.reader(f)
+    return [header, *sorted(rows, key=lambda row: int(row[0]))]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Export:
+
+    @pytest.mark.parametrize('name', ('titles', 'review', 'comments'))
+    def test_01_csv_matches_static_layout(self, admin_client, name):
+        call_command('load_csv', stdout=StringIO())
+        url = f'/api/v1/export/{name}.csv'
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` отдаётся потоком.'
+        )
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content, newline='')))
+        assert rows == read_source(name), (
+            f'Проверьте, что выгрузка `{url}` совпадает по раскладке и '
+            'содержимому с файлом из static/data.'
+        )
+
+    def test_02_ndjson(self, admin_client):
+        call_command('load_csv', stdout=StringIO())
+        response = admin_client.get('/api/v1/export/review.ndjson')
+        assert response.status_code == HTTPStatus.OK
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        first = json.loads(lines[0])
+        assert len(lines) == 72
+        assert list(first) == read_source('review')[0]
+        assert first['pub_date'] == '2019-09-24T21:08:21.567Z'
+
+    def test_03_export_permissions(self, client, user_client, admin_client):
+        url = '/api/v1/export/users.csv'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get('/api/v1/export/unknown.csv')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15EmailQueue:
+
+    @pytest.fixture(autouse=True)
+    def queue_emails(self, settings):
+        settings.EMAIL_DISPATCHER = 'users.mail.QueueDispatcher'
+
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import QueuedEmail
+
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при отправке через очередь письмо не '
+            'отправляется в рамках запроса.'
+        )
+        queued = QueuedEmail.objects.get()
+        assert queued.to == [data['email']]
+        assert queued.sent is None
+
+        call_command('send_queued_emails', once=True, stdout=StringIO())
+
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [data['email']]
+        queued.refresh_from_db()
+        assert queued.sent is not None and queued.attempts == 1
+
+    def test_02_failed_emails_are_retried(self, monkeypatch):
+        from django.core.mail import EmailMessage
+
+        from users.mail import send_email, send_queued_emails
+        from users.models import QueuedEmail
+
+        for idx in range(3):
+            send_email('Тема', 'Текст', [f'user{idx}@yamdb.fake'])
+
+        original_send = EmailMessage.send
+
+        def flaky_send(message, *args, **kwargs):
+            if message.to == ['user1@yamdb.fake']:
+                raise ConnectionError('SMTP недоступен')
+            return original_send(message, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, 'send', flaky_send)
+        assert send_queued_emails(batch_size=10, max_attempts=2) == (2, 1)
+        failed = QueuedEmail.objects.get(sent__isnull=True)
+        assert failed.attempts == 1 and 'SMTP' in failed.error
+        assert send_queued_emails(batch_size=10, max_attempts=2) == (0, 1)
+        assert send_queued_emails(batch_size=10, max_attempts=2) == (0, 0), (
+            'Проверьте, что письмо больше не отправляется после '
+            'исчерпания попыток.'
+        )
+
+    def test_03_no_transaction_while_sending(self, monkeypatch):
+        from django.core.mail import EmailMessage
+        from django.db import connection
+
+        from users.mail import claim_queued_emails, send_email
+        from users.mail import send_queued_emails
+        from users.models import QueuedEmail
+
+        for idx in range(3):
+            send_email('Тема', 'Текст', [f'user{idx}@yamdb.fake'])
+        claimed = claim_queued_emails(1, 5, claim_timeout=300)
+        assert len(claimed) == 1
+
+        original_send = EmailMessage.send
+
+        def checked_send(message, *args, **kwargs):
+            assert not connection.in_atomic_block, (
+                'Проверьте, что письма отправляются вне транзакции.'
+            )
+            return original_send(message, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, 'send', checked_send)
+        assert send_queued_emails(batch_size=10) == (2, 0), (
+            'Проверьте, что письма, занятые другим отправителем, '
+            'пропускаются.'
+        )
+        QueuedEmail.objects.filter(pk=claimed[0].pk).update(
+            claimed_until=None
+        )
+        assert send_queued_emails(batch_size=10) == (1, 0)
+        assert not QueuedEmail.objects.filter(
+            claimed_until__isnull=False
+        ).exists()
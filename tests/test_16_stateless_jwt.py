@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def role_client(user):
+    from api.authentication import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16StatelessJWT:
+
+    def test_01_token_has_role_claims(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user.confirmation_code = 'code'
+        user.save()
+        response = client.post(
+            '/api/v1/auth/token/',
+            data={'username': user.username, 'confirmation_code': 'code'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == user.role
+        assert token['username'] == user.username
+        assert token['is_staff'] is False
+
+    def test_02_no_user_query(self, admin, django_assert_num_queries):
+        client = role_client(admin)
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        client.get('/api/v1/categories/')
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что для токена с ролью в claims пользователь не '
+            'читается из базы данных.'
+        )
+
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == admin.email
+
+    def test_03_revoke_token(self, user):
+        client = role_client(user)
+        response = client.post('/api/v1/auth/token/revoke/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отозванный токен больше не принимается.'
+        )
+
+    def test_04_role_change_revokes_tokens(self, admin_client, user):
+        client = role_client(user)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что после смены роли токены пользователя со старой '
+            'ролью отзываются.'
+        )
+        user.refresh_from_db()
+        assert role_client(user).get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_05_delete_revokes_tokens(self, admin_client, user):
+        client = role_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токены удалённого пользователя отзываются.'
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleResponseCache:
+
+    def test_01_detail_cached(self, client, django_assert_num_queries):
+        titles = create_catalog(2)
+        url = f'/api/v1/titles/{titles[0].id}/'
+        first = client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.status_code == HTTPStatus.OK
+        assert second['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся '
+            'из кэша без запросов к базе.'
+        )
+        assert second.json() == first.json()
+
+    def test_02_review_invalidates_its_title_only(self, client, admin_client):
+        titles = create_catalog(2, reviews_per_title=0)
+        url = f'/api/v1/titles/{titles[0].id}/'
+        other_url = f'/api/v1/titles/{titles[1].id}/'
+        list_url = '/api/v1/titles/?limit=1&offset=1'
+        for address in (url, other_url, list_url):
+            client.get(address)
+
+        response = admin_client.post(
+            f'{url}reviews/', data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает закэшированную '
+            'карточку своего произведения.'
+        )
+        assert client.get(other_url)['X-Cache'] == 'HIT'
+        assert client.get(list_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что новый отзыв не сбрасывает страницы списка, '
+            'на которых нет этого произведения.'
+        )
+
+    def test_03_catalog_changes_invalidate(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        titles = create_catalog(1, genres_per_title=1)
+        url = f'/api/v1/titles/{titles[0].id}/'
+        list_url = '/api/v1/titles/'
+        client.get(url)
+        client.get(list_url)
+
+        category = Category.objects.get()
+        category.name = 'Кино'
+        category.save()
+        assert client.get(url).json()['category']['name'] == 'Кино'
+        assert client.get(list_url)['X-Cache'] == 'MISS'
+
+        genre = Genre.objects.create(name='Новый', slug='new')
+        Title.objects.get().genre.add(genre)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert {'name': 'Новый', 'slug': 'new'} in response.json()['genre']
+
+        response = admin_client.post(list_url, data={
+            'name': 'Ещё одно', 'year': 2000, 'genre': ['new'],
+            'category': 'films'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(list_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+    def test_04_stats(self, client, admin_client, user_client):
+        titles = create_catalog(1)
+        url = f'/api/v1/titles/{titles[0].id}/'
+        client.get(url)
+        client.get(url)
+        client.get(url)
+        stats_url = '/api/v1/cache/stats/'
+        assert user_client.get(stats_url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(stats_url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'titles': {'hits': 2, 'misses': 1}}
+
+    def test_05_write_during_render_not_cached(self, client, monkeypatch):
+        import time
+
+        from django.core.cache import cache
+
+        from api.cache import VERSION_PREFIX
+        from api.mixins import TitleResponseCacheMixin
+
+        titles = create_catalog(1)
+        url = f'/api/v1/titles/{titles[0].id}/'
+        dependencies = TitleResponseCacheMixin.get_response_dependencies
+
+        def changed_during_render(self, objects):
+            # категория изменена и зафиксирована, пока ответ собирался
+            cache.set(
+                f'{VERSION_PREFIX}category:{titles[0].category_id}',
+                time.time_ns(), None
+            )
+            return dependencies(self, objects)
+
+        monkeypatch.setattr(
+            TitleResponseCacheMixin, 'get_response_dependencies',
+            changed_during_render
+        )
+        assert client.get(url)['X-Cache'] == 'MISS'
+        monkeypatch.undo()
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Проверьте, что ответ не кэшируется, если версия его '
+            'зависимости сменилась во время запроса.'
+        )
+        assert client.get(url)['X-Cache'] == 'HIT'
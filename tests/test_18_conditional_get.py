@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+def revalidate(client, url, response, **headers):
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('ETag'), (
+        f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+    )
+    assert response.has_header('Last-Modified')
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConditionalGet:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/', '/api/v1/titles/{title}/', '/api/v1/genres/',
+        '/api/v1/categories/', '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ))
+    def test_01_not_modified(self, client, django_assert_num_queries, url):
+        title = create_catalog(1)[0]
+        url = url.format(title=title.id, review=title.reviews.first().id)
+        response = client.get(url)
+        with django_assert_num_queries(0):
+            second = revalidate(client, url, response)
+        assert second.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag '
+            'получает ответ 304 без запросов к базе.'
+        )
+        assert not second.content
+        assert second['ETag'] == response['ETag']
+
+        third = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert third.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_02_modified_after_write(self, client, admin_client):
+        title = create_catalog(1, reviews_per_title=1)[0]
+        review = title.reviews.get()
+        urls = (
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/reviews/',
+        )
+        responses = [client.get(url) for url in urls]
+        comments_url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        )
+        comments = client.get(comments_url)
+
+        response = admin_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        for url, response in zip(urls, responses):
+            assert revalidate(client, url, response).status_code == (
+                HTTPStatus.OK
+            ), (
+                f'Проверьте, что после нового отзыва GET-запрос к `{url}` '
+                'со старым ETag получает полный ответ.'
+            )
+        assert revalidate(client, comments_url, comments).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        ), (
+            'Проверьте, что новый отзыв не меняет ETag комментариев '
+            'к другому отзыву.'
+        )
+
+    def test_03_etag_depends_on_query(self, client):
+        create_catalog(2)
+        response = client.get('/api/v1/titles/?limit=1')
+        second = client.get(
+            '/api/v1/titles/?limit=2', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert second.status_code == HTTPStatus.OK
+
+    def test_04_writes_without_signals(self, client):
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.db import transaction
+
+        from api.cache import bump_versions, get_versions
+
+        title = create_catalog(1)[0]
+        url = f'/api/v1/titles/{title.id}/'
+        response = client.get(url)
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert revalidate(client, url, response).status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что команды, пишущие в обход сигналов, сдвигают '
+            'версии данных.'
+        )
+
+        before = get_versions('titles')
+        with transaction.atomic():
+            bump_versions('titles')
+            assert get_versions('titles') == before, (
+                'Проверьте, что версии сдвигаются только после фиксации '
+                'транзакции.'
+            )
+        assert get_versions('titles') != before
+
+    def test_05_shared_cache_check(self, settings):
+        from api.checks import check_shared_cache
+
+        settings.DEBUG = True
+        assert check_shared_cache(None) == []
+        settings.DEBUG = False
+        assert [error.id for error in check_shared_cache(None)] == [
+            'api.E001'
+        ], (
+            'Проверьте, что без DEBUG кэш в памяти процесса запрещён.'
+        )
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19FastJSON:
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_01_same_output(self, client, monkeypatch, fast):
+        import api.renderers
+
+        if not fast:
+            monkeypatch.setattr(api.renderers, 'orjson', None)
+        title = create_catalog(3)[0]
+        title.name = 'Строка\u2028с разделителем "и кавычками"'
+        title.save()
+        for url in ('/api/v1/titles/',
+                    f'/api/v1/titles/{title.id}/reviews/'):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.content == JSONRenderer().render(
+                response.json()
+            ), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` совпадает '
+                'с выводом JSONRenderer.'
+            )
+
+    def test_02_indent(self, client):
+        create_catalog(1)
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        assert response.content.startswith(b'{\n  "count"')
+
+    def test_03_parser(self, admin_client):
+        url = '/api/v1/categories/'
+        response = admin_client.post(
+            url, data='{"name": "Кино", "slug": "films"}',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json() == {'name': 'Кино', 'slug': 'films'}
+        for body in ('{"name": ', '{"name": NaN, "slug": "nan"}'):
+            response = admin_client.post(
+                url, data=body, content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` с некорректным JSON '
+                'возвращает ответ со статусом 400.'
+            )
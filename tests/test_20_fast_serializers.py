@@ -0,0 +1,44 @@
+import pytest
+from django.core.cache import cache
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20FastReadSerializers:
+
+    def test_01_same_output(self, client, monkeypatch):
+        from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+        from reviews.models import Comment, Title
+
+        titles = create_catalog(5, genres_per_title=2)
+        Title.objects.create(name='Без категории', year=1990)
+        Title.objects.filter(pk=titles[1].pk).update(
+            rating_sum=17, rating_count=3, description='Описание'
+        )
+        review = titles[0].reviews.first()
+        Comment.objects.create(review=review, author=review.author, text='1')
+        Comment.objects.create(review=review, author=review.author, text='2')
+        urls = (
+            '/api/v1/titles/', '/api/v1/titles/?limit=3&offset=2',
+            '/api/v1/titles/?cursor=&limit=2', '/api/v1/titles/?genre=genre-0',
+            f'/api/v1/titles/{titles[1].id}/',
+            f'/api/v1/titles/{Title.objects.get(category=None).id}/',
+            f'/api/v1/titles/{titles[0].id}/reviews/',
+            f'/api/v1/titles/{titles[0].id}/reviews/?cursor=&limit=2',
+            f'/api/v1/titles/{titles[0].id}/reviews/{review.id}/',
+            f'/api/v1/titles/{titles[0].id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{titles[0].id}/reviews/{review.id}/comments/'
+            f'{review.comments.first().id}/',
+        )
+        responses = [client.get(url) for url in urls]
+        assert all(response.status_code == 200 for response in responses)
+        fast = [response.content for response in responses]
+        for viewset in (TitleViewSet, ReviewViewSet, CommentViewSet):
+            monkeypatch.setattr(viewset, 'fast_read_serializer_class', None)
+        cache.clear()
+        for url, content in zip(urls, fast):
+            assert client.get(url).content == content, (
+                f'Проверьте, что быстрый сериализатор для `{url}` отдаёт '
+                'тот же ответ, что и обычный.'
+            )
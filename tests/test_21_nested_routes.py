@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21NestedRoutes:
+
+    def test_01_comment_chain_checked(self, admin_client):
+        first, second = create_catalog(2)
+        review = first.reviews.first()
+        foreign = f'/api/v1/titles/{second.id}/reviews/{review.id}/comments/'
+        response = admin_client.get(foreign)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву недоступны по адресу '
+            'другого произведения.'
+        )
+        response = admin_client.post(foreign, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert not review.comments.exists()
+
+        url = f'/api/v1/titles/{first.id}/reviews/{review.id}/comments/'
+        response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        comment_id = response.json()['id']
+        response = admin_client.get(f'{foreign}{comment_id}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_parent_loaded_once(self, admin_client,
+                                   django_assert_num_queries):
+        title = create_catalog(1)[0]
+        review = title.reviews.first()
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        # токен фикстуры без claims: пользователь читается из БД
+        admin_client.get(reviews_url)
+        with django_assert_num_queries(3):
+            response = admin_client.get(f'{reviews_url}{review.id}/')
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(3):
+            response = admin_client.post(
+                comments_url, data={'text': 'Комментарий'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        with django_assert_num_queries(3):
+            response = admin_client.get(
+                f'{comments_url}{response.json()["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_duplicate_review(self, admin_client, admin,
+                                 django_assert_num_queries):
+        title = create_catalog(1, reviews_per_title=0)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        admin_client.get(url)
+        # пользователь, BEGIN, произведение, INSERT отзыва, UPDATE рейтинга
+        # и гистограммы
+        with django_assert_num_queries(6):
+            response = admin_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = admin_client.post(url, data={'text': 'Нет', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'non_field_errors': [
+            'Вы уже написали ревью к этому произведению.'
+        ]}
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что отклонённый повторный отзыв не меняет рейтинг.'
+        )
+
+    def test_04_other_integrity_errors(self, admin_client, monkeypatch):
+        from django.db import IntegrityError
+
+        from api.serializers import ReviewSerializer
+
+        title = create_catalog(1, reviews_per_title=0)[0]
+
+        def broken_save(self, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(ReviewSerializer, 'save', broken_save)
+        with pytest.raises(IntegrityError):
+            admin_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Да', 'score': 7}
+            )
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_catalog
+
+
+def histogram(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/stats/')
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22TitleStats:
+
+    def test_01_endpoint(self, client, django_assert_num_queries):
+        title = create_catalog(1, reviews_per_title=2)[0]
+        url = f'/api/v1/titles/{title.id}/stats/'
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected['5'] = 2
+        assert response.json() == {
+            'title': title.id, 'count': 2, 'average': 5.0,
+            'histogram': expected,
+        }, f'Проверьте ответ на GET-запрос к `{url}`.'
+        for pk in (title.id + 1, 'abc'):
+            response = client.get(f'/api/v1/titles/{pk}/stats/')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что для несуществующего произведения '
+                f'`/api/v1/titles/{pk}/stats/` возвращает 404.'
+            )
+
+    def test_02_incremental(self, client, admin_client, admin):
+        from reviews.models import Review, Title, TitleStats
+
+        title = create_catalog(2, reviews_per_title=1)[0]
+        other = Title.objects.exclude(pk=title.pk).get()
+        fresh = Title.objects.create(name='Без отзывов', year=2000)
+        assert histogram(client, fresh.id)['count'] == 0
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = admin_client.post(url, data={'text': 'Да', 'score': 9})
+        assert response.status_code == HTTPStatus.CREATED
+        review_id = response.json()['id']
+        admin_client.patch(f'{url}{review_id}/', data={'score': 3})
+        admin_client.delete(f'{url}{review_id}/')
+        moved = Review.objects.filter(title=other).get()
+        moved.title = fresh
+        moved.save()
+        Review.objects.create(title=fresh, author=admin, text='1', score=10)
+
+        stats = histogram(client, title.id)
+        assert (stats['count'], stats['histogram']['5']) == (1, 1)
+        assert stats['histogram']['3'] == stats['histogram']['9'] == 0
+        assert histogram(client, other.id)['count'] == 0
+        stats = histogram(client, fresh.id)
+        assert stats['histogram']['5'] == stats['histogram']['10'] == 1
+        assert stats['average'] == 7.5
+
+        before = {
+            stats.pk: stats.histogram for stats in TitleStats.objects.all()
+        }
+        call_command('rebuild_title_stats')
+        after = {
+            stats.pk: stats.histogram for stats in TitleStats.objects.all()
+        }
+        assert before == after, (
+            'Проверьте, что статистика, обновляемая при изменении отзывов, '
+            'совпадает с пересчитанной командой rebuild_title_stats.'
+        )
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_catalog
+
+
+def leaders(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return [
+        (row['title']['id'], row['position'])
+        for row in response.json()['results']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Leaderboards:
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Genre, Title, TitleGenre
+
+        titles = create_catalog(4, genres_per_title=1)
+        # (сумма, количество): 10.0 по 1 отзыву, 9.0 по 10, 7.0 по 3, 5.0
+        counters = ((10, 1), (90, 10), (21, 3), (15, 3))
+        for title, (score_sum, count) in zip(titles, counters):
+            Title.objects.filter(pk=title.pk).update(
+                rating_sum=score_sum, rating_count=count
+            )
+        Title.objects.filter(pk=titles[3].pk).update(year=1999)
+        books = Category.objects.create(name='Книга', slug='books')
+        Title.objects.filter(pk=titles[2].pk).update(category=books)
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        TitleGenre.objects.create(title=titles[3], genre=drama)
+        call_command('refresh_leaderboards')
+        return [title.id for title in titles]
+
+    def test_01_global(self, client, titles, django_assert_num_queries):
+        first, second, third, fourth = titles
+        with django_assert_num_queries(1):
+            assert leaders(client, '/api/v1/leaderboards/') == [
+                (second, 1), (third, 2), (fourth, 3)
+            ], (
+                'Проверьте, что в таблицу по средней оценке попадают только '
+                'произведения с достаточным числом отзывов.'
+            )
+        assert leaders(
+            client, '/api/v1/leaderboards/?metric=bayesian'
+        )[:2] == [(second, 1), (first, 2)]
+        assert leaders(
+            client, '/api/v1/leaderboards/?metric=reviews&limit=1'
+        ) == [(second, 1)]
+
+    def test_02_scopes(self, client, titles):
+        first, second, third, fourth = titles
+        assert leaders(client, '/api/v1/leaderboards/genre/drama/') == [
+            (fourth, 1)
+        ]
+        assert leaders(
+            client, '/api/v1/leaderboards/category/films/?metric=reviews'
+        ) == [(second, 1), (fourth, 2), (first, 3)]
+        assert leaders(client, '/api/v1/leaderboards/year/1999/') == [
+            (fourth, 1)
+        ]
+        assert client.get(
+            '/api/v1/leaderboards/genre/unknown/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            '/api/v1/leaderboards/?metric=unknown'
+        ).status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+def ids(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleOrdering:
+
+    @pytest.fixture
+    def titles(self, admin, moderator, user):
+        from reviews.models import Review, Title
+
+        titles = create_catalog(4, reviews_per_title=0)
+        scores = ((admin, 9), (moderator, 3), (user, 8))
+        for author, score in scores:
+            Review.objects.create(
+                title=titles[0], author=author, text='text', score=score
+            )
+        Review.objects.create(title=titles[1], author=admin, text='t', score=7)
+        Review.objects.create(title=titles[2], author=admin, text='t', score=1)
+        moved = Review.objects.create(
+            title=titles[3], author=user, text='t', score=2
+        )
+        moved.delete()
+        Title.objects.filter(pk=titles[3].pk).update(year=1990)
+        return [title.id for title in titles]
+
+    def test_01_stored_average(self, titles):
+        from reviews.models import Title
+
+        averages = dict(Title.objects.values_list('id', 'rating_avg'))
+        assert [averages[pk] for pk in titles] == [
+            pytest.approx(20 / 3), 7.0, 1.0, 0.0
+        ], 'Проверьте, что средняя оценка хранится и обновляется отзывами.'
+
+    def test_02_ordering(self, client, titles):
+        first, second, third, fourth = titles
+        assert ids(client, '/api/v1/titles/?ordering=-rating') == [
+            second, first, third, fourth
+        ], (
+            'Проверьте, что `/api/v1/titles/?ordering=-rating` сортирует '
+            'произведения по средней оценке.'
+        )
+        # при равенстве - по названию в том же направлении
+        assert ids(client, '/api/v1/titles/?ordering=-review_count')[:3] == [
+            first, third, second
+        ]
+        assert ids(client, '/api/v1/titles/?ordering=year')[0] == fourth
+        assert ids(client, '/api/v1/titles/?ordering=-name') == [
+            fourth, third, second, first
+        ]
+
+        pages = []
+        url = '/api/v1/titles/?ordering=-rating&cursor=&limit=3'
+        while url:
+            data = client.get(url).json()
+            pages.append([title['id'] for title in data['results']])
+            url = data['next']
+        assert pages == [[second, first, third], [fourth]]
+
+    def test_03_uses_index(self):
+        from django.db import connection
+
+        from api.filters import FilterTitle
+        from reviews.models import Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('План проверяется только для SQLite.')
+        for ordering, index in (('-rating', 'title_rating_avg_name_idx'),
+                                ('review_count',
+                                 'title_rating_count_name_idx')):
+            queryset = FilterTitle(
+                {'ordering': ordering}, queryset=Title.objects.all()
+            ).qs[:10]
+            plan = queryset.explain()
+            assert index in plan and 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что сортировка `{ordering}` читает индекс '
+                f'без полной сортировки: {plan}'
+            )
+
+    def test_04_cached_page_follows_reviews(self, client, admin_client):
+        titles = create_catalog(3, reviews_per_title=0)
+        url = '/api/v1/titles/?ordering=-rating&limit=1'
+        assert ids(client, url) == [titles[2].id]
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 10}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert ids(client, url) == [titles[0].id], (
+            'Проверьте, что отзыв к произведению не с этой страницы '
+            'сбрасывает закэшированную страницу с сортировкой по рейтингу.'
+        )
@@ -0,0 +1,156 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+URL = '/api/v1/titles/bulk/'
+
+
+def items(count, genres=('genre-0', 'genre-1')):
+    return [
+        {'name': f'Новинка {idx}', 'year': 2001, 'category': 'films',
+         'genre': list(genres)}
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25BulkTitles:
+
+    def test_01_create_json_and_ndjson(self, client, admin_client):
+        create_catalog(1)
+        response = admin_client.post(URL, data=items(3), format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос администратора к `{URL}` с массивом '
+            'произведений возвращает ответ со статусом 200.'
+        )
+        results = response.json()['results']
+        assert [item['status'] for item in results] == ['created'] * 3
+        title = client.get(f'/api/v1/titles/{results[0]["id"]}/').json()
+        assert title['name'] == 'Новинка 0'
+        assert title['category']['slug'] == 'films'
+        assert [genre['slug'] for genre in title['genre']] == [
+            'genre-0', 'genre-1'
+        ]
+        response = client.get('/api/v1/titles/?name=Новинка')
+        assert response.json()['count'] == 3, (
+            'Проверьте, что массовое создание обновляет поисковый индекс.'
+        )
+
+        body = ''.join(
+            json.dumps(item, ensure_ascii=False) + '\n'
+            for item in items(2, genres=('genre-2',))
+        )
+        response = admin_client.post(
+            URL, data=body.encode(), content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/titles/?genre=genre-2').json()[
+            'count'] == 3
+
+    def test_02_item_errors_and_updates(self, client, admin_client):
+        title = create_catalog(1)[0]
+        client.get('/api/v1/titles/')
+        data = [
+            {'name': 'Без года', 'category': 'films', 'genre': ['genre-0']},
+            {'name': 'Ок', 'year': 2001, 'category': 'films',
+             'genre': ['genre-0']},
+            {'name': 'Нет жанра', 'year': 2001, 'category': 'films',
+             'genre': ['missing']},
+            {'id': title.id, 'name': 'Переименовано', 'genre': ['genre-2']},
+            {'id': 10 ** 9, 'name': 'Нет такого'},
+            'строка',
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [
+            'error', 'created', 'error', 'updated', 'error', 'error'
+        ], (
+            f'Проверьте, что `{URL}` возвращает результат для каждого '
+            'элемента, а ошибки одного элемента не мешают остальным.'
+        )
+        assert 'year' in results[0]['errors']
+        assert 'genre' in results[2]['errors']
+        assert results[3]['id'] == title.id
+
+        response = client.get(f'/api/v1/titles/{title.id}/').json()
+        assert response['name'] == 'Переименовано'
+        assert response['year'] == title.year
+        assert [genre['slug'] for genre in response['genre']] == ['genre-2']
+        names = {item['name'] for item in client.get(
+            '/api/v1/titles/?name=Переименовано').json()['results']}
+        assert names == {'Переименовано'}, (
+            'Проверьте, что массовое изменение обновляет поисковый индекс.'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 2, (
+            'Проверьте, что массовое создание сбрасывает кэш списка '
+            'произведений.'
+        )
+
+    def test_03_query_count(self, admin_client, django_assert_num_queries):
+        titles = create_catalog(50)
+        admin_client.get('/api/v1/titles/')
+        requests = [
+            [{'id': title.id, 'name': f'Новое {title.id}',
+              'genre': ['genre-1']} for title in titles[:size]]
+            # до 100 связей: Django удаляет их одним DELETE
+            for size in (2, 30)
+        ] + [items(2), items(50)]
+        for small, large in zip(requests[::2], requests[1::2]):
+            counts = []
+            for data in (small, large):
+                with django_assert_num_queries(14, exact=False) as context:
+                    response = admin_client.post(URL, data=data, format='json')
+                assert response.status_code == HTTPStatus.OK
+                counts.append(len(context))
+            assert counts[0] == counts[1], (
+                f'Проверьте, что число запросов к БД у `{URL}` не зависит '
+                'от числа произведений.'
+            )
+
+    @pytest.mark.parametrize('vendor', ('sqlite', 'other'))
+    def test_04_created_ids(self, client, admin_client, monkeypatch, vendor):
+        from django.db import connection
+
+        from reviews.models import Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Чтение id обратно проверяется на SQLite.')
+        # other - бекенд без RETURNING, где строки вставляются по одной
+        monkeypatch.setattr(connection, 'vendor', vendor)
+        create_catalog(1)
+        data = [
+            {'name': f'Новинка {idx}', 'year': 2001, 'category': 'films',
+             'genre': [f'genre-{idx % 3}']}
+            for idx in range(6)
+        ]
+        results = admin_client.post(URL, data=data, format='json').json()[
+            'results'
+        ]
+        for item, result in zip(data, results):
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == item['name']
+            assert list(title.genre.values_list('slug', flat=True)) == (
+                item['genre']
+            ), (
+                'Проверьте, что жанры привязываются к созданным '
+                'произведениям.'
+            )
+
+    def test_05_access_and_format(self, client, user_client, admin_client):
+        body = json.dumps(items(1))
+        assert client.post(
+            URL, data=body, content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            URL, data=body, content_type='application/json'
+        ).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.post(URL, data=items(1)[0], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            URL, data=b'{"name": 1}\n{', content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,156 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+URL = '/api/v1/reviews/ingest/'
+
+
+def create_readers(count):
+    from users.models import User
+
+    User.objects.bulk_create(
+        User(username=f'reader{idx}', email=f'reader{idx}@yamdb.fake')
+        for idx in range(count)
+    )
+
+
+def ndjson(rows):
+    return ''.join(
+        (row if isinstance(row, str) else json.dumps(row)) + '\n'
+        for row in rows
+    ).encode()
+
+
+def ingest(client, rows, query=''):
+    return client.post(
+        f'{URL}{query}', data=ndjson(rows),
+        content_type='application/x-ndjson'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ReviewIngest:
+
+    @pytest.mark.parametrize('batch_size', (2, 500))
+    def test_01_ingest(self, client, admin_client, batch_size):
+        from reviews.models import TitleStats
+
+        title, other = create_catalog(2, reviews_per_title=1)
+        create_readers(3)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        assert client.get(reviews_url).json()['count'] == 1
+        rows = [
+            {'title': title.id, 'author': 'reader0', 'text': 'a', 'score': 9},
+            {'title': title.id, 'author': 'reader1', 'text': 'b', 'score': 1},
+            {'title': other.id, 'author': 'reader0', 'text': 'c', 'score': 7},
+            {'title': title.id, 'author': 'reader0', 'text': 'd', 'score': 2},
+            {'title': title.id, 'author': 'author0', 'text': 'e', 'score': 2},
+            {'title': 10 ** 9, 'author': 'reader2', 'text': 'f', 'score': 2},
+            {'title': title.id, 'author': 'nobody', 'text': 'g', 'score': 2},
+            {'title': title.id, 'author': 'reader2', 'text': 'h', 'score': 11},
+            '{"title": ',
+            '',
+        ]
+        response = ingest(admin_client, rows, f'?batch_size={batch_size}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос администратора к `{URL}` с NDJSON '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert {key: data[key] for key in (
+            'lines', 'created', 'duplicates', 'invalid'
+        )} == {'lines': 9, 'created': 3, 'duplicates': 2, 'invalid': 4}, (
+            f'Проверьте, что `{URL}` пропускает повторные отзывы и считает '
+            'ошибочные строки.'
+        )
+        errors = {error['line']: error['errors'] for error in data['errors']}
+        assert sorted(errors) == [6, 7, 8, 9]
+        assert 'title' in errors[6]
+        assert 'author' in errors[7]
+        assert 'score' in errors[8]
+
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 3), (
+            'Проверьте, что загрузка отзывов обновляет рейтинг произведения.'
+        )
+        assert title.rating_avg == 5.0
+        assert TitleStats.objects.get(title=title).histogram == {
+            **{score: 0 for score in range(1, 11)}, 1: 1, 5: 1, 9: 1
+        }
+        assert client.get(reviews_url).json()['count'] == 3, (
+            'Проверьте, что загрузка отзывов сбрасывает кэш списка отзывов.'
+        )
+        response = client.get(f'/api/v1/titles/{other.id}/')
+        assert response.json()['rating'] == 6
+
+    def test_02_query_count(self, admin_client, django_assert_num_queries):
+        titles = create_catalog(50, reviews_per_title=0)
+        create_readers(2)
+        ingest(admin_client, [])
+        counts = []
+        for author, size in (('reader0', 2), ('reader1', 50)):
+            rows = [
+                {'title': title.id, 'author': author, 'text': 't', 'score': 5}
+                for title in titles[:size]
+            ]
+            with django_assert_num_queries(15, exact=False) as context:
+                response = ingest(admin_client, rows)
+            assert response.json()['created'] == size
+            counts.append(len(context))
+            assert not any(
+                query['sql'].startswith('UPDATE')
+                and 'reviews_review' in query['sql']
+                for query in context.captured_queries
+            ), (
+                f'Проверьте, что `{URL}` сдвигает рейтинг на оценки новых '
+                'отзывов, а не пересчитывает все отзывы произведения.'
+            )
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов к БД у `{URL}` не зависит от '
+            'числа строк в одной порции.'
+        )
+
+    def test_03_concurrent_duplicate(self, admin_client, monkeypatch):
+        from reviews.models import Review
+        from users.models import User
+
+        title, other = create_catalog(2, reviews_per_title=0)
+        create_readers(2)
+        reader = User.objects.get(username='reader1')
+        Review.objects.create(
+            title=title, author=reader, text='раньше', score=1
+        )
+        review_filter = Review.objects.filter
+
+        def stale_filter(*args, **kwargs):
+            # первая проверка не видит отзыв, добавленный параллельно
+            monkeypatch.setattr(Review.objects, 'filter', review_filter)
+            return review_filter(*args, **kwargs).exclude(author=reader)
+
+        monkeypatch.setattr(Review.objects, 'filter', stale_filter)
+        rows = [
+            {'title': title.id, 'author': 'reader0', 'text': 'a', 'score': 9},
+            {'title': title.id, 'author': 'reader1', 'text': 'b', 'score': 8},
+            {'title': other.id, 'author': 'reader1', 'text': 'c', 'score': 7},
+        ]
+        data = ingest(admin_client, rows).json()
+        assert (data['created'], data['duplicates']) == (2, 1), (
+            'Проверьте, что отзыв, пропущенный из-за параллельной вставки, '
+            'не считается созданным.'
+        )
+        assert Review.objects.get(title=title, author=reader).text == 'раньше'
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (10, 2)
+
+    def test_04_access_and_params(self, client, user_client, admin_client):
+        create_catalog(1)
+        assert ingest(client, []).status_code == HTTPStatus.UNAUTHORIZED
+        assert ingest(user_client, []).status_code == HTTPStatus.FORBIDDEN
+        for query in ('?batch_size=0', '?batch_size=x'):
+            response = ingest(admin_client, [], query)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(URL, data=[], format='json')
+        assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
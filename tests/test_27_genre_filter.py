@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def create_titles_with_genres():
+    from reviews.models import Category, Genre, Title, TitleGenre
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = {
+        slug: Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'horror')
+    }
+    catalog = {
+        'Драма': ('drama',),
+        'Комедия': ('comedy',),
+        'Драмеди': ('drama', 'comedy'),
+        'Всё сразу': ('drama', 'comedy', 'horror'),
+    }
+    for name, slugs in catalog.items():
+        title = Title.objects.create(name=name, year=2000, category=category)
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genres[slug]) for slug in slugs
+        )
+
+
+def names(response):
+    assert response.status_code == HTTPStatus.OK
+    return {item['name'] for item in response.json()['results']}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27GenreFilter:
+    url = '/api/v1/titles/'
+
+    def test_01_any_and_all(self, client):
+        create_titles_with_genres()
+        assert names(client.get(f'{self.url}?genre=DRAMA')) == {
+            'Драма', 'Драмеди', 'Всё сразу'
+        }
+        assert names(client.get(f'{self.url}?genre=drama,horror')) == {
+            'Драма', 'Драмеди', 'Всё сразу'
+        }, (
+            f'Проверьте, что `{self.url}?genre=a,b` возвращает произведения '
+            'хотя бы с одним из жанров.'
+        )
+        assert names(client.get(
+            f'{self.url}?genre=drama,comedy&genre_mode=all'
+        )) == {'Драмеди', 'Всё сразу'}, (
+            f'Проверьте, что `{self.url}?genre=a,b&genre_mode=all` '
+            'возвращает произведения со всеми жанрами.'
+        )
+        assert names(client.get(
+            f'{self.url}?genre=drama,unknown&genre_mode=all'
+        )) == set()
+        assert names(client.get(f'{self.url}?genre=drama,unknown')) == {
+            'Драма', 'Драмеди', 'Всё сразу'
+        }
+        assert names(client.get(f'{self.url}?genre=unknown')) == set()
+        response = client.get(f'{self.url}?genre=drama&genre_mode=some')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_exists_without_join(self, client):
+        create_titles_with_genres()
+        client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'{self.url}?genre=drama,comedy&genre_mode=all'
+            )
+        assert response.json()['count'] == 2
+        listed = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'EXISTS' in query['sql']
+        ]
+        assert listed and not any(
+            'JOIN "reviews_titlegenre"' in sql for sql in listed
+        ), (
+            f'Проверьте, что фильтр `genre` для `{self.url}` использует '
+            'подзапрос EXISTS, а не JOIN через таблицу связей.'
+        )
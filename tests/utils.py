@@ -305,3 +305,44 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def create_catalog(size, genres_per_title=3, reviews_per_title=3):
+    from api.cache import EPOCH, bump_versions
+    from reviews.models import (Category, Genre, Review, Title, TitleGenre,
+                                TitleStats)
+    from users.models import User
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(genres_per_title)
+    )
+    genres = list(Genre.objects.filter(slug__startswith='genre-'))
+    User.objects.bulk_create(
+        User(username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+        for idx in range(reviews_per_title)
+    )
+    authors = list(User.objects.filter(username__startswith='author'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}', year=2000, category=category,
+            rating_sum=5 * reviews_per_title, rating_count=reviews_per_title,
+            rating_avg=5.0 if reviews_per_title else 0.0
+        )
+        for idx in range(size)
+    )
+    titles = list(Title.objects.all())
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=title, genre=genre)
+        for title in titles for genre in genres
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='text', score=5)
+        for title in titles for author in authors
+    )
+    TitleStats.objects.bulk_create(
+        TitleStats(title=title, score_5=reviews_per_title) for title in titles
+    )
+    bump_versions(EPOCH)
+    return titles